@@ -1,10 +1,12 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_migrate import Migrate
+from app.replicas import RoutingSession, REPLICA_BIND_PREFIX, create_replica_router
 
-# Initialize extensions
-db = SQLAlchemy()
+# Initialize extensions (db.session routes @read_replica views to a replica)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 def create_app():
@@ -16,11 +18,74 @@ def create_app():
     # Load configuration
     app.config.from_object('config.Config')
     
+    # Fast JSON encoding for every jsonify() response
+    from app.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
+    # Connection pool sizing, pre-ping, recycle and statement timeout from Config;
+    # explicit SQLALCHEMY_ENGINE_OPTIONS entries take precedence
+    from app.db_pool import PoolStats, engine_options, install_statement_timeout, dispose_engines_after_fork
+    pool_stats = PoolStats()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config, pool_stats),
+        **app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    }
+    app.extensions['db_pool_stats'] = pool_stats
+    
+    # Read replicas get the same pool settings, each with its own checkout statistics
+    binds = dict(app.config['SQLALCHEMY_BINDS'])
+    for key, uri in binds.items():
+        if key.startswith(REPLICA_BIND_PREFIX) and isinstance(uri, str):
+            binds[key] = {'url': uri, **engine_options(app.config, PoolStats(), uri)}
+    app.config['SQLALCHEMY_BINDS'] = binds
+    
     # Initialize extensions with app
     db.init_app(app)
-    migrate.init_app(app, db)  # Add this line
+    with app.app_context():
+        for engine in db.engines.values():
+            install_statement_timeout(engine, app.config)
+    
+    # Forked workers start with empty pools instead of the parent's connections
+    dispose_engines_after_fork(app)
+    from app.models import include_object
+    migrate.init_app(app, db, include_object=include_object)
     CORS(app)
     
+    # Replica picked for each @read_replica request (None without replica binds)
+    app.extensions['replica_router'] = create_replica_router(app)
+    
+    # Cache of generated export files, invalidated through the data version
+    if app.config['EXPORT_CACHE_ENABLED']:
+        from app.export_cache import ExportCache
+        cache_dir = app.config['EXPORT_CACHE_DIR'] or os.path.join(app.instance_path, 'export_cache')
+        app.extensions['export_cache'] = ExportCache(cache_dir, app.config['EXPORT_CACHE_MAX_BYTES'])
+    
+    # In-memory type-ahead index; skipped quietly while the tables do not exist yet
+    # (e.g. when create_app runs for 'flask db upgrade')
+    if app.config['SEARCH_INDEX_ENABLED']:
+        from app.search_index import NgramIndex
+        index = NgramIndex()
+        with app.app_context():
+            try:
+                index.load(db.session)
+            except Exception as e:
+                app.logger.warning(f'Search index not built: {e}')
+            finally:
+                db.session.remove()
+        app.extensions['search_index'] = index
+    
+    # Response cache for read endpoints (None when RESPONSE_CACHE_BACKEND is 'none')
+    from app.response_cache import create_response_cache
+    app.extensions['response_cache'] = create_response_cache(app.config)
+    
+    # Change feed behind /api/events (None when EVENTS_BACKEND is 'none')
+    from app.events import create_change_feed
+    app.extensions['change_feed'] = create_change_feed(app)
+    
+    # Per-request SQL/serialization timing and slow-query log (when SQL_INSTRUMENTATION is set)
+    from app.instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
     # Import and register routes
     with app.app_context():
         from app import routes
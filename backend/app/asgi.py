@@ -0,0 +1,447 @@
+import asyncio
+from contextlib import asynccontextmanager
+from a2wsgi import WSGIMiddleware
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_date
+from app import create_app, db
+from app.db_pool import async_engine_options, install_statement_timeout
+from app.events import AsyncSubscription, RESYNC
+from app.models import Family, Person, DataVersion, Counters
+from app.response_cache import MemoryBackend, _SKIPPED_HEADERS
+from app.search import family_matches, search_settings
+from app.serializers import (
+    FamilyProjection, member_statements, group_members, serialize_person_rows, page_statement, split_page
+)
+from app.sync import ChangeQueries, parse_sync_token, group_tombstones
+from app.utils import summarize_family_sizes
+from app.validators import data_validators, family_validators, is_not_modified, validator_headers
+
+
+# Async driver used for each database backend when ASYNC_DATABASE_URI is not set
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_uri(uri):
+    """Turn a sync SQLAlchemy URI into the matching async driver URI"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend}')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class AsyncReadAPI:
+    """
+    Async versions of the read endpoints in app/routes.py, on an async engine
+    Same URLs, parameters, response bodies and validators as the Flask views; the
+    query building and serialization (FamilyProjection, family_matches, keyset
+    pagination, response cache keys) are shared with them
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        uri = self.config['ASYNC_DATABASE_URI'] or async_database_uri(self.config['SQLALCHEMY_DATABASE_URI'])
+        self.engine = create_async_engine(uri, **{
+            **async_engine_options(self.config, uri),
+            **self.config['ASYNC_ENGINE_OPTIONS']
+        })
+        install_statement_timeout(self.engine.sync_engine, self.config)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    # ----- helpers -----
+
+    def _json(self, obj, status=200):
+        body = self.flask_app.json.dumps_bytes(obj) + b'\n'
+        return Response(body, status_code=status, media_type='application/json')
+
+    def _error(self, error, status):
+        return self._json({'error': str(error)}, status)
+
+    @staticmethod
+    def _flag(request, name):
+        return request.query_params.get(name, '').lower() in ('1', 'true', 'yes')
+
+    def _page_limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.config['FAMILIES_PAGE_SIZE']))
+        except ValueError:
+            limit = self.config['FAMILIES_PAGE_SIZE']
+        return max(1, min(limit, self.config['FAMILIES_MAX_PAGE_SIZE']))
+
+    @staticmethod
+    async def _data_validators(session, prefix):
+        row = (await session.execute(DataVersion.current_select())).first()
+        return data_validators(prefix, *(row if row else (0, None)))
+
+    @staticmethod
+    def _is_not_modified(request, etag, last_modified):
+        return is_not_modified(request.headers.get('if-none-match'),
+                               request.headers.get('if-modified-since'), etag, last_modified)
+
+    @staticmethod
+    def _with_validators(response, etag, last_modified):
+        response.headers.update(validator_headers(etag, last_modified))
+        return response
+
+    def _not_modified(self, etag, last_modified):
+        return self._with_validators(Response(status_code=304), etag, last_modified)
+
+    async def _serialize(self, session, projection, rows):
+        members = None
+        if projection.include_members:
+            family_ids = [row.cursor_id for row in rows]
+            member_rows = []
+            for statement in member_statements(family_ids):
+                member_rows.extend((await session.execute(statement)).all())
+            members = group_members(family_ids, member_rows)
+        return projection.serialize(rows, members)
+
+    @staticmethod
+    async def _cache_call(cache, fn, *args):
+        """Call a response cache method, off the event loop when its backend does network I/O"""
+        if isinstance(cache.backend, MemoryBackend):
+            return fn(*args)
+        return await run_in_threadpool(fn, *args)
+
+    def cached(self, endpoint, tags):
+        """
+        Async counterpart of response_cache.cached, sharing its entries: keys use the
+        Flask endpoint name, so either serving mode answers from the other's entries
+        """
+
+        def decorator(handler):
+            async def wrapper(request):
+                cache = self.flask_app.extensions.get('response_cache')
+                if cache is None:
+                    return await handler(request)
+
+                view_args = dict(request.path_params)
+                key = await self._cache_call(cache, cache.make_key, endpoint, view_args,
+                                             request.query_params.multi_items(), tags(**view_args))
+                entry = await self._cache_call(cache, cache.backend.get, key)
+                if entry is not None:
+                    cache.hits += 1
+                    status, headers, body = entry
+                    headers = {name.lower(): value for name, value in headers}
+                    etag = headers.get('etag', '').removeprefix('W/').strip('"')
+                    last_modified = parse_date(headers.get('last-modified'))
+                    if etag and self._is_not_modified(request, etag, last_modified):
+                        return Response(status_code=304, headers={
+                            name: headers[name] for name in ('etag', 'last-modified', 'cache-control')
+                            if name in headers
+                        })
+                    response = Response(body, status_code=status, headers=headers)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                cache.misses += 1
+                response = await handler(request)
+                if response.status_code == 200 and not isinstance(response, StreamingResponse):
+                    headers = [(name, value) for name, value in response.headers.items()
+                               if name.lower() not in _SKIPPED_HEADERS]
+                    await self._cache_call(cache, cache.backend.set, key, (200, headers, response.body))
+                response.headers['X-Cache'] = 'MISS'
+                return response
+
+            return wrapper
+
+        return decorator
+
+    # ----- families -----
+
+    async def get_families(self, request):
+        try:
+            projection = FamilyProjection.from_request(request.query_params)
+
+            async with self.sessions() as session:
+                etag, last_modified = await self._data_validators(session, 'families')
+                if self._is_not_modified(request, etag, last_modified):
+                    return self._not_modified(etag, last_modified)
+
+                query = projection.select()
+
+                if self._flag(request, 'stream'):
+                    ndjson = request.query_params.get('format') == 'ndjson'
+                    response = StreamingResponse(
+                        self._stream_families(query, projection, ndjson),
+                        media_type='application/x-ndjson' if ndjson else 'application/json'
+                    )
+                    return self._with_validators(response, etag, last_modified)
+
+                if self._flag(request, 'all'):
+                    rows = (await session.execute(query.order_by(Family.created_at.desc()))).all()
+                    response = self._json(await self._serialize(session, projection, rows))
+                    return self._with_validators(response, etag, last_modified)
+
+                limit = self._page_limit(request)
+                statement = page_statement(query, limit, request.query_params.get('cursor'))
+                rows, next_cursor = split_page((await session.execute(statement)).all(), limit)
+                response = self._json({
+                    'families': await self._serialize(session, projection, rows),
+                    'next_cursor': next_cursor
+                })
+                return self._with_validators(response, etag, last_modified)
+        except ValueError as e:
+            return self._error(e, 400)
+        except Exception as e:
+            return self._error(e, 500)
+
+    async def _stream_families(self, query, projection, ndjson):
+        """Stream from a server-side cursor, STREAM_BATCH_SIZE rows at a time"""
+        dumps = self.flask_app.json.dumps
+        batch_size = self.config['STREAM_BATCH_SIZE']
+        query = query.order_by(Family.created_at.desc(), Family.id.desc())
+        first = True
+
+        if not ndjson:
+            yield '['
+
+        async with self.sessions() as session:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            async for batch in result.partitions():
+                encoded = [dumps(family) for family in await self._serialize(session, projection, batch)]
+
+                if ndjson:
+                    yield ''.join(item + '\n' for item in encoded)
+                else:
+                    yield ('' if first else ',') + ','.join(encoded)
+                    first = False
+
+        if not ndjson:
+            yield ']'
+
+    async def get_family(self, request):
+        family_id = request.path_params['id']
+        try:
+            projection = FamilyProjection.from_request(request.query_params)
+
+            async with self.sessions() as session:
+                row = (await session.execute(
+                    projection.select().add_columns(Family.updated_at.label('etag_updated_at'))
+                    .where(Family.id == family_id)
+                )).one_or_none()
+                if row is None:
+                    return self._json({'error': 'Family not found'}, 404)
+
+                etag, last_modified = family_validators(family_id, row.etag_updated_at)
+                if self._is_not_modified(request, etag, last_modified):
+                    return self._not_modified(etag, last_modified)
+
+                family = (await self._serialize(session, projection, [row]))[0]
+                return self._with_validators(self._json(family), etag, last_modified)
+        except ValueError as e:
+            return self._error(e, 400)
+        except Exception as e:
+            return self._error(e, 404)
+
+    # ----- stats -----
+
+    async def get_stats(self, request):
+        try:
+            async with self.sessions() as session:
+                etag, last_modified = await self._data_validators(session, 'stats')
+                if self._is_not_modified(request, etag, last_modified):
+                    return self._not_modified(etag, last_modified)
+
+                counts = (await session.execute(
+                    db.select(Counters.total_families, Counters.total_guests).where(Counters.id == 1)
+                )).first()
+                if counts is None:
+                    counts = (
+                        await session.scalar(db.select(db.func.count(Family.id))),
+                        await session.scalar(db.select(db.func.count(Person.id)))
+                    )
+
+                response = self._json({'total_families': counts[0], 'total_guests': counts[1]})
+                return self._with_validators(response, etag, last_modified)
+        except Exception as e:
+            return self._error(e, 500)
+
+    async def get_stats_summary(self, request):
+        try:
+            async with self.sessions() as session:
+                size_rows = (await session.execute(
+                    db.select(
+                        Family.member_count,
+                        db.func.count(Family.id),
+                        db.func.min(Family.family_name)
+                    ).group_by(Family.member_count)
+                )).all()
+            return self._json(summarize_family_sizes(size_rows))
+        except Exception as e:
+            return self._error(e, 500)
+
+    # ----- search -----
+
+    async def search(self, request):
+        try:
+            projection = FamilyProjection.from_request(request.query_params)
+            query = request.query_params.get('q', '').strip()
+            backend = self.config['SEARCH_BACKEND']
+
+            # The search backends read config and the in-memory index from the Flask app
+            with self.flask_app.app_context():
+                matches = family_matches(query, backend) if query else None
+                settings = search_settings(backend)
+
+            if matches is None:
+                if self._flag(request, 'all'):
+                    return self._json([])
+                return self._json({'families': [], 'next_cursor': None})
+
+            matches = matches.subquery()
+            families_query = projection.select().join(matches, matches.c.family_id == Family.id)
+
+            async with self.sessions() as session:
+                for statement, params in settings:
+                    await session.execute(statement, params)
+
+                if self._flag(request, 'all'):
+                    rows = (await session.execute(families_query.order_by(Family.family_name))).all()
+                    return self._json(await self._serialize(session, projection, rows))
+
+                limit = self._page_limit(request)
+                if request.query_params.get('order') == 'relevance':
+                    rows = (await session.execute(
+                        families_query.order_by(matches.c.rank.desc(), Family.family_name).limit(limit)
+                    )).all()
+                    return self._json({
+                        'families': await self._serialize(session, projection, rows),
+                        'next_cursor': None
+                    })
+
+                statement = page_statement(families_query, limit, request.query_params.get('cursor'))
+                rows, next_cursor = split_page((await session.execute(statement)).all(), limit)
+                return self._json({
+                    'families': await self._serialize(session, projection, rows),
+                    'next_cursor': next_cursor
+                })
+        except ValueError as e:
+            return self._error(e, 400)
+        except Exception as e:
+            return self._error(e, 500)
+
+    # ----- sync and events -----
+
+    async def get_changes(self, request):
+        try:
+            async with self.sessions() as session:
+                row = (await session.execute(DataVersion.sync_state_select())).first()
+                version, sync_floor = row if row else (0, 0)
+
+                since, error, status = parse_sync_token(request.query_params.get('since'), version, sync_floor)
+                if error:
+                    return self._json({'error': error}, status)
+
+                queries = ChangeQueries(since)
+                tombstones = ()
+                if queries.tombstones is not None:
+                    tombstones = (await session.execute(queries.tombstones)).all()
+
+                families = queries.projection.serialize((await session.execute(queries.families)).all())
+                persons = serialize_person_rows(await session.execute(queries.persons))
+
+            return self._json({
+                'token': str(version),
+                'families': families,
+                'persons': persons,
+                'deleted': group_tombstones(tombstones)
+            })
+        except Exception as e:
+            return self._error(e, 500)
+
+    async def change_events(self, request):
+        """Same stream as the Flask view, but idle clients hold no thread"""
+        feed = self.flask_app.extensions.get('change_feed')
+        if feed is None:
+            return self._json({'error': 'Change feed is not enabled'}, 503)
+
+        subscription = feed.subscribe(AsyncSubscription, loop=asyncio.get_running_loop())
+        if subscription is None:
+            return self._json({'error': 'Too many event stream clients'}, 503)
+
+        try:
+            async with self.sessions() as session:
+                row = (await session.execute(DataVersion.sync_state_select())).first()
+                version = row.version if row else 0
+        except Exception:
+            feed.broker.unsubscribe(subscription)
+            raise
+
+        heartbeat = self.config['EVENTS_HEARTBEAT']
+
+        async def generate():
+            try:
+                yield f'retry: 5000\nevent: ready\ndata: {{"token":"{version}"}}\n\n'
+                while True:
+                    message = await subscription.get_async(heartbeat)
+                    if message is None:
+                        yield ': keepalive\n\n'
+                    elif message is RESYNC:
+                        yield 'event: resync\ndata: {}\n\n'
+                    else:
+                        yield message
+            finally:
+                feed.broker.unsubscribe(subscription)
+
+        return StreamingResponse(generate(), media_type='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+
+    def routes(self):
+        """Async routes, named after the Flask endpoints they replace"""
+        return [
+            Route('/api/families', self.cached('api.get_families', lambda: ['families'])(self.get_families),
+                  methods=['GET']),
+            Route('/api/families/{id:int}',
+                  self.cached('api.get_family', lambda id: [f'family:{id}'])(self.get_family),
+                  methods=['GET']),
+            Route('/api/stats', self.cached('api.get_stats', lambda: ['stats'])(self.get_stats),
+                  methods=['GET']),
+            Route('/api/stats/summary',
+                  self.cached('api.get_stats_summary', lambda: ['families'])(self.get_stats_summary),
+                  methods=['GET']),
+            Route('/api/search', self.cached('api.search', lambda: ['families'])(self.search),
+                  methods=['GET']),
+            Route('/api/changes', self.get_changes, methods=['GET']),
+            Route('/api/events', self.change_events, methods=['GET']),
+        ]
+
+
+def create_asgi_app():
+    """
+    ASGI application factory: the async read endpoints in front of the Flask app
+    Every other route (writes, exports, import, admin) is served by the Flask app
+    through a WSGI adapter, so all write-side session hooks (counters, data
+    version, sync stamps, cache invalidation, change feed) stay in one place
+    """
+    flask_app = create_app()
+    api = AsyncReadAPI(flask_app)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await api.engine.dispose()
+
+    return Starlette(
+        routes=[
+            *api.routes(),
+            Mount('/', WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_THREADS'])),
+        ],
+        middleware=[
+            Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        ],
+        lifespan=lifespan,
+    )
@@ -0,0 +1,99 @@
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+from app.models import Family, Person, add_to_counters, bump_data_version
+from app.search_index import index_committed_rows
+from app.response_cache import invalidate, tags_for_families
+from app.events import publish_changes, bulk_change
+from app.utils import validate_family_data, validate_person_data
+
+
+def parse_family_entry(item):
+    """
+    Validate one family entry with nested members
+    Members may be given as names or as {"name": ...} objects
+    Returns: ((family_name, address, member_names), None) or (None, error_message)
+    """
+    
+    try:
+        is_valid, error = validate_family_data(item)
+        if not is_valid:
+            return None, error
+        
+        members = item.get('members') or []
+        if not isinstance(members, list):
+            return None, 'Members must be a list'
+        
+        member_names = []
+        for member in members:
+            person = member if isinstance(member, dict) else {'name': member}
+            is_valid, error = validate_person_data(person, require_family_id=False)
+            if not is_valid:
+                return None, f'Member {len(member_names) + 1}: {error}'
+            member_names.append(person['name'].strip())
+        
+        return (item['family_name'].strip(), item['address'].strip(), member_names), None
+        
+    except (AttributeError, TypeError):
+        return None, 'Invalid family data'
+
+
+def insert_families(entries):
+    """
+    Insert validated (family_name, address, member_names) entries in the current
+    transaction with batched multi-row INSERT ... RETURNING statements
+    Bulk INSERTs skip the ORM flush hooks, so counters, the data version and the
+    rows' sync_version are set here; call publish_inserted_families() with the
+    result after committing
+    Returns: (family_ids, person_rows) - person_rows include their new 'id'
+    """
+    
+    now = datetime.utcnow()
+    connection = db.session.connection()
+    version = bump_data_version(connection)
+    
+    family_ids = db.session.scalars(
+        insert(Family).returning(Family.id, sort_by_parameter_order=True),
+        [{
+            'family_name': family_name,
+            'address': address,
+            'member_count': len(member_names),
+            'created_at': now,
+            'updated_at': now,
+            'sync_version': version
+        } for family_name, address, member_names in entries]
+    ).all()
+    
+    person_rows = [
+        {'family_id': family_id, 'name': name, 'created_at': now, 'updated_at': now,
+         'sync_version': version}
+        for family_id, (_, _, member_names) in zip(family_ids, entries)
+        for name in member_names
+    ]
+    if person_rows:
+        person_ids = db.session.scalars(
+            insert(Person).returning(Person.id, sort_by_parameter_order=True),
+            person_rows
+        ).all()
+        for person_id, row in zip(person_ids, person_rows):
+            row['id'] = person_id
+    
+    add_to_counters(connection, len(family_ids), len(person_rows))
+    
+    return family_ids, person_rows
+
+
+def publish_inserted_families(entries, family_ids, person_rows):
+    """
+    Feed committed bulk inserts to the in-memory search index, drop the
+    response-cache entries they affect and notify /api/events clients
+    (all three bypass the ORM session events)
+    """
+    
+    index_committed_rows(
+        families=[(family_id, family_name, address)
+                  for family_id, (family_name, address, _) in zip(family_ids, entries)],
+        persons=[(row['id'], row['family_id'], row['name']) for row in person_rows]
+    )
+    invalidate(tags_for_families(family_ids))
+    publish_changes([bulk_change(len(family_ids), len(person_rows))])
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+import uuid
+import weakref
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Checkout counters for one process's pool (wait = time spent in checkout)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_ms_total': round(self.total_wait * 1000, 3),
+                'wait_ms_avg': round(self.total_wait * 1000 / attempts, 3) if attempts else 0.0,
+                'wait_ms_max': round(self.max_wait * 1000, 3),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long every checkout waited in cls.stats"""
+
+    stats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+
+def timed_pool_class(stats):
+    """A TimedQueuePool subclass bound to stats (pool.recreate() keeps the class)"""
+    return type('TimedQueuePool', (TimedQueuePool,), {'stats': stats})
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _pool_options(config):
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def engine_options(config, stats=None, uri=None):
+    """
+    Engine options for uri (default SQLALCHEMY_DATABASE_URI) built from the
+    DB_POOL_* / DB_STATEMENT_TIMEOUT settings
+    An in-memory SQLite database keeps Flask-SQLAlchemy's single static connection.
+    The statement timeout is passed as a startup option, except behind PgBouncer
+    (which rejects startup options) where install_statement_timeout() sets it
+    per transaction instead
+    """
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    if _is_memory_sqlite(url):
+        return {}
+
+    options = _pool_options(config)
+    if stats is not None:
+        options['poolclass'] = timed_pool_class(stats)
+
+    timeout = config['DB_STATEMENT_TIMEOUT']
+    if timeout and url.get_backend_name() == 'postgresql' and not config['DB_PGBOUNCER']:
+        options['connect_args'] = {'options': f'-c statement_timeout={timeout}'}
+    return options
+
+
+def async_engine_options(config, url):
+    """Same settings for the ASGI app's async engine (asyncpg/aiosqlite) at url"""
+    url = make_url(url)
+    if _is_memory_sqlite(url):
+        return {}
+
+    options = _pool_options(config)
+    if url.get_backend_name() != 'postgresql':
+        return options
+
+    connect_args = {}
+    if config['DB_PGBOUNCER']:
+        # PgBouncer in transaction mode can route each statement to another server
+        # connection, so asyncpg must not reuse named prepared statements
+        connect_args['statement_cache_size'] = 0
+        connect_args['prepared_statement_cache_size'] = 0
+        connect_args['prepared_statement_name_func'] = lambda: f'__asyncpg_{uuid.uuid4()}__'
+    elif config['DB_STATEMENT_TIMEOUT']:
+        connect_args['server_settings'] = {'statement_timeout': str(config['DB_STATEMENT_TIMEOUT'])}
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+def install_statement_timeout(engine, config):
+    """
+    Behind PgBouncer, apply DB_STATEMENT_TIMEOUT with SET LOCAL at the start of each
+    transaction - it ends with the transaction, so it never leaks to other clients
+    of the same server connection
+    """
+    timeout = config['DB_STATEMENT_TIMEOUT']
+    if not (timeout and config['DB_PGBOUNCER'] and engine.dialect.name == 'postgresql'):
+        return
+
+    @event.listens_for(engine, 'begin')
+    def _set_statement_timeout(connection):
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout)}')
+
+
+def pool_status(engine):
+    """Live state of engine's pool, plus checkout wait statistics when recorded"""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        status.update(pool.stats.snapshot())
+    return status
+
+
+def dispose_engines(app, close=False):
+    """
+    Drop the pooled connections of every engine (primary and replicas)
+    close=False after fork: the child forgets the connections it inherited without
+    closing them, since the parent's sockets are still in use by the parent
+    """
+    db = app.extensions['sqlalchemy']
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def dispose_engines_after_fork(app):
+    """
+    Run dispose_engines(app) in every process forked from this one, so preforked
+    workers (flask serve, gunicorn --preload wsgi:app) never share a pooled connection
+    """
+    app_ref = weakref.ref(app)
+
+    def after_in_child():
+        app = app_ref()
+        if app is not None:
+            dispose_engines(app)
+
+    os.register_at_fork(after_in_child=after_in_child)
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from app import db
+from app.models import Family, Person
+
+
+logger = logging.getLogger(__name__)
+
+# Supported cross-process backends for Config.EVENTS_BACKEND ('none' disables /api/events)
+EVENTS_BACKENDS = ('none', 'local', 'postgres')
+
+# Queued in place of the dropped messages when a client falls behind
+RESYNC = object()
+
+# PostgreSQL NOTIFY payloads must stay below 8000 bytes
+_NOTIFY_MAX_BYTES = 7900
+
+
+class Subscription:
+    """
+    One SSE client's bounded queue of encoded messages
+    A client that lets the queue fill up loses the backlog and gets a single RESYNC
+    marker instead, so a slow reader never blocks publishers or grows memory
+    """
+
+    def __init__(self, max_size):
+        self._queue = queue.Queue(max_size)
+
+    def offer(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            with self._queue.mutex:
+                self._queue.queue.clear()
+                self._queue.queue.append(RESYNC)
+                self._queue.not_empty.notify()
+
+    def get(self, timeout):
+        """Next message, RESYNC, or None if nothing arrived within timeout seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """
+    Subscription awaited from an asyncio event loop (the ASGI app) - waiting
+    clients hold no thread, only a pending asyncio.Event
+    """
+
+    def __init__(self, max_size, loop):
+        super().__init__(max_size)
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def offer(self, message):
+        super().offer(message)
+        # Publishers run on request threads; wake the waiter on its own loop
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    def _get_nowait(self):
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    async def get_async(self, timeout):
+        """Next message, RESYNC, or None if nothing arrived within timeout seconds"""
+        message = self._get_nowait()
+        if message is not None:
+            return message
+        self._ready.clear()
+        message = self._get_nowait()
+        if message is not None:
+            return message
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self._get_nowait()
+
+
+class ChangeBroker:
+    """In-process fan-out of change messages to every subscribed SSE client"""
+
+    def __init__(self, queue_size, max_clients):
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, factory=Subscription, limit=None, **kwargs):
+        """
+        Returns: a new factory(queue_size, **kwargs), or None when max_clients are
+        connected or limit subscriptions of this factory already are
+        """
+        with self._lock:
+            if len(self._subscriptions) >= self.max_clients:
+                return None
+            if limit is not None and \
+                    sum(type(subscription) is factory for subscription in self._subscriptions) >= limit:
+                return None
+            subscription = factory(self.queue_size, **kwargs)
+            self._subscriptions.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, changes):
+        """Encode a batch of changes once and queue it for every client"""
+        message = f'event: change\ndata: {json.dumps(changes, separators=(",", ":"))}\n\n'
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self.published += 1
+        for subscription in subscriptions:
+            subscription.offer(message)
+
+    def stats(self):
+        return {'clients': len(self._subscriptions), 'published': self.published}
+
+
+class LocalBackend:
+    """
+    Delivers committed changes straight to this process's broker
+    Clients only see writes made by the same process - use it with a single worker
+    """
+
+    transactional = False
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def start(self):
+        pass
+
+    def publish(self, changes, connection=None):
+        self.broker.publish(changes)
+
+
+class PostgresNotifyBackend:
+    """
+    Cross-process fan-out over PostgreSQL LISTEN/NOTIFY (psycopg2)
+    Changes are NOTIFYed inside the writing transaction, so PostgreSQL delivers them
+    only on commit; every process (the writer included) LISTENs on one dedicated
+    connection and hands notifications to its own broker
+    """
+
+    transactional = True
+
+    def __init__(self, broker, engine, channel):
+        self.broker = broker
+        self.engine = engine
+        self.channel = channel
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the listener thread (lazily, so forked workers each get their own)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen, name='change-feed-listener',
+                                                daemon=True)
+                self._thread.start()
+
+    def publish(self, changes, connection):
+        for payload in self._payloads(changes):
+            connection.execute(db.select(func.pg_notify(self.channel, payload)))
+
+    @staticmethod
+    def _payloads(changes):
+        """Split changes into JSON arrays that fit in a NOTIFY payload"""
+        batch, size = [], 2
+        for change in changes:
+            encoded = json.dumps(change, separators=(',', ':'))
+            if batch and size + len(encoded) + 1 > _NOTIFY_MAX_BYTES:
+                yield f'[{",".join(batch)}]'
+                batch, size = [], 2
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            yield f'[{",".join(batch)}]'
+
+    def _listen(self):
+        while True:
+            try:
+                raw = self.engine.raw_connection()
+                try:
+                    connection = raw.driver_connection
+                    connection.autocommit = True
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'LISTEN "{self.channel}"')
+                    while True:
+                        if select.select([connection], [], [], 30) == ([], [], []):
+                            continue
+                        connection.poll()
+                        while connection.notifies:
+                            notify = connection.notifies.pop(0)
+                            self.broker.publish(json.loads(notify.payload))
+                finally:
+                    raw.invalidate()
+            except Exception as e:
+                logger.warning(f'Change feed listener failed, reconnecting: {e}')
+                time.sleep(5)
+
+
+class ChangeFeed:
+    """The broker plus the backend that carries changes between processes"""
+
+    def __init__(self, broker, backend):
+        self.broker = broker
+        self.backend = backend
+
+    def subscribe(self, factory=Subscription, limit=None, **kwargs):
+        self.backend.start()
+        return self.broker.subscribe(factory, limit, **kwargs)
+
+    def publish_committed(self, changes):
+        """Publish changes whose transaction has already committed"""
+        if not changes:
+            return
+        if self.backend.transactional:
+            with db.engine.begin() as connection:
+                self.backend.publish(changes, connection)
+        else:
+            self.backend.publish(changes)
+
+
+def thread_client_limit(config):
+    """Event streams a process may serve from request threads (the Flask view)"""
+    limit = config['EVENTS_MAX_THREAD_CLIENTS']
+    return limit if limit is not None else max(config['SERVER_THREADS'] - 1, 0)
+
+
+def create_change_feed(app):
+    """Build the ChangeFeed selected by Config, or None when disabled"""
+    config = app.config
+    backend = config['EVENTS_BACKEND']
+    if backend == 'none':
+        return None
+
+    broker = ChangeBroker(config['EVENTS_QUEUE_SIZE'], config['EVENTS_MAX_CLIENTS'])
+    if backend == 'local':
+        return ChangeFeed(broker, LocalBackend(broker))
+    if backend == 'postgres':
+        with app.app_context():
+            engine = db.engine
+        return ChangeFeed(broker, PostgresNotifyBackend(broker, engine, config['EVENTS_CHANNEL']))
+    raise ValueError(f'Unknown events backend: {backend}')
+
+
+# ==================== SESSION EVENTS ====================
+# Changes are collected per flush and published once the transaction commits
+
+_PENDING_KEY = 'change_feed_pending'
+
+
+def _current_feed():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('change_feed')
+
+
+def _timestamp(value):
+    return value.isoformat() if value else None
+
+
+def family_change(family_id, op, updated_at=None):
+    return {'type': 'family', 'id': family_id, 'op': op, 'updated_at': _timestamp(updated_at)}
+
+
+def person_change(person_id, family_id, op, updated_at=None):
+    return {'type': 'person', 'id': person_id, 'family_id': family_id, 'op': op,
+            'updated_at': _timestamp(updated_at)}
+
+
+def bulk_change(families, persons):
+    """Summary of a bulk insert - clients catch up through /api/changes"""
+    return {'type': 'bulk', 'op': 'created', 'families': families, 'persons': persons}
+
+
+def publish_changes(changes):
+    """Publish changes written outside the ORM unit of work (bulk inserts), after commit"""
+    feed = _current_feed()
+    if feed is not None:
+        feed.publish_committed(changes)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    feed = _current_feed()
+    if feed is None:
+        return
+
+    changes = []
+    for op, objects in (('created', session.new), ('updated', session.dirty),
+                        ('deleted', session.deleted)):
+        for obj in objects:
+            updated_at = None if op == 'deleted' else obj.updated_at
+            if isinstance(obj, Family):
+                changes.append(family_change(obj.id, op, updated_at))
+            elif isinstance(obj, Person):
+                changes.append(person_change(obj.id, obj.family_id, op, updated_at))
+
+    if not changes:
+        return
+    if feed.backend.transactional:
+        feed.backend.publish(changes, session.connection())
+    else:
+        session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    feed = _current_feed()
+    if changes and feed is not None:
+        feed.backend.publish(changes)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
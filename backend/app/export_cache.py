@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import threading
+
+
+class ExportCache:
+    """
+    Size-bounded LRU cache of generated export files on local disk
+    Keys combine the export format with the global data version, so any
+    family/person write makes older entries unreachable; they age out via LRU
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """
+        Look up a cached artifact
+        Returns: file path on a hit (and marks it recently used), None on a miss
+        """
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, fileobj):
+        """
+        Store the contents of a file-like object under key
+        Returns: path of the cached file
+        """
+        fd, tmp_path = self._tempfile()
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(fileobj, out)
+            return self._commit(key, tmp_path)
+        except BaseException:
+            self._discard(tmp_path)
+            raise
+
+    def tee(self, key, chunks):
+        """
+        Pass chunks through unchanged while writing them to the cache
+        The entry is only stored if the stream is consumed to the end
+        Yields: the original chunks
+        """
+        fd, tmp_path = self._tempfile()
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    yield chunk
+            self._commit(key, tmp_path)
+        except BaseException:
+            # Client disconnected or generation failed - never cache a partial file
+            self._discard(tmp_path)
+            raise
+
+    def _tempfile(self):
+        return tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+
+    def _commit(self, key, tmp_path):
+        path = self._path(key)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+        return path
+
+    @staticmethod
+    def _discard(tmp_path):
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        The entry at keep (the one just written) is never evicted
+        """
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith('.tmp-') and entry.path != keep:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            if keep:
+                total += os.path.getsize(keep)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._discard(path)
+                total -= size
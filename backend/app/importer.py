@@ -0,0 +1,183 @@
+import csv
+import io
+from itertools import chain
+from openpyxl import load_workbook
+from app.utils import CSV_TABLE_HEADER, EXCEL_STRUCTURED_HEADER
+
+
+# Supported upload formats for /api/import
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+# Layouts recognised in uploads (the same ones the exports produce)
+IMPORT_LAYOUTS = ('table', 'structured', 'block')
+
+# Headers accepted for tabular uploads that were not produced by our export
+_TABLE_ALIASES = {
+    'family id': 'Family ID',
+    'family': 'Family Name',
+    'family name': 'Family Name',
+    'address': 'Address',
+    'person id': 'Person ID',
+    'member': 'Person Name',
+    'person': 'Person Name',
+    'person name': 'Person Name',
+    'name': 'Person Name',
+}
+
+
+def _cell(value):
+    """Normalize a CSV/XLSX cell to a stripped string"""
+    return '' if value is None else str(value).strip()
+
+
+def _clean(rows):
+    """Yield rows as lists of stripped strings"""
+    for row in rows:
+        yield [_cell(value) for value in row]
+
+
+def _is_blank(row):
+    return not any(row)
+
+
+def _split_members(text):
+    return [name.strip() for name in text.split(',') if name.strip()]
+
+
+def detect_layout(row):
+    """
+    Work out the upload layout from its first non-empty row
+    Returns: one of IMPORT_LAYOUTS - raises ValueError if the layout is unknown
+    """
+    if row and row[0].upper() == 'WEDDING GUEST LIST':
+        return 'block'
+    if row[:len(EXCEL_STRUCTURED_HEADER)] == EXCEL_STRUCTURED_HEADER:
+        return 'structured'
+    headers = {_TABLE_ALIASES.get(cell.lower()) for cell in row}
+    if {'Family Name', 'Address', 'Person Name'} <= headers:
+        return 'table'
+    raise ValueError(
+        'Unrecognized layout: expected the block export, the structured sheet or '
+        f'tabular columns ({", ".join(CSV_TABLE_HEADER)})'
+    )
+
+
+def _parse_table(header, rows):
+    """
+    One row per person; consecutive rows with the same family (by Family ID when
+    present, otherwise by name + address) are grouped into one family
+    """
+    columns = {}
+    for position, cell in enumerate(header):
+        column = _TABLE_ALIASES.get(cell.lower())
+        if column and column not in columns:
+            columns[column] = position
+
+    def get(row, column):
+        position = columns.get(column)
+        return row[position] if position is not None and position < len(row) else ''
+
+    family = None
+    family_key = None
+
+    for row in rows:
+        if _is_blank(row):
+            continue
+        family_name, address = get(row, 'Family Name'), get(row, 'Address')
+        key = get(row, 'Family ID') or (family_name, address)
+
+        if family is None or key != family_key:
+            if family is not None:
+                yield family
+            family = {'family_name': family_name, 'address': address, 'members': []}
+            family_key = key
+
+        name = get(row, 'Person Name')
+        if name:
+            family['members'].append(name)
+
+    if family is not None:
+        yield family
+
+
+def _parse_structured(rows):
+    """One row per family: Family, Address, Members (comma separated), Count"""
+    for row in rows:
+        if _is_blank(row):
+            continue
+        row = row + [''] * (3 - len(row))
+        yield {'family_name': row[0], 'address': row[1], 'members': _split_members(row[2])}
+
+
+def _parse_block(rows):
+    """
+    The human-readable export: 'Family: ...', 'Address: ...', 'Members: a, b' blocks
+    Totals, separators and the grand total line are ignored
+    """
+    family = None
+
+    for row in rows:
+        text = row[0] if row else ''
+        label, _, value = text.partition(':')
+        label = label.strip().lower()
+
+        if label == 'family':
+            if family is not None:
+                yield family
+            family = {'family_name': value.strip(), 'address': '', 'members': []}
+        elif family is not None and label == 'address':
+            family['address'] = value.strip()
+        elif family is not None and label == 'members':
+            family['members'] = _split_members(value)
+
+    if family is not None:
+        yield family
+
+
+def parse_rows(rows):
+    """
+    Parse an iterable of rows in any supported layout into family dicts
+    ({family_name, address, members}), consuming the rows lazily
+    Returns: (layout, iterator of family dicts)
+    """
+    rows = _clean(rows)
+    for first in rows:
+        if not _is_blank(first):
+            break
+    else:
+        raise ValueError('The uploaded file is empty')
+
+    layout = detect_layout(first)
+    if layout == 'table':
+        return layout, _parse_table(first, rows)
+    if layout == 'structured':
+        return layout, _parse_structured(rows)
+    return layout, _parse_block(chain([first], rows))
+
+
+def iter_csv_rows(binary_stream):
+    """
+    Read CSV rows from a binary upload stream without loading it into memory
+    Malformed CSV (NUL bytes, oversized fields) raises ValueError, like undecodable bytes
+    """
+    text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text_stream)
+    except csv.Error as e:
+        raise ValueError(f'Malformed CSV: {e}') from e
+
+
+def iter_xlsx_rows(binary_stream):
+    """
+    Read rows from an XLSX upload with openpyxl's read-only (streaming) mode
+    Prefers the 'Structured' sheet of our own exports, otherwise the first sheet
+    """
+    workbook = load_workbook(binary_stream, read_only=True, data_only=True)
+    try:
+        if 'Structured' in workbook.sheetnames:
+            sheet = workbook['Structured']
+        else:
+            sheet = workbook.worksheets[0]
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
@@ -0,0 +1,167 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from app import db
+from app.json_provider import FastJSONProvider
+
+
+logger = logging.getLogger(__name__)
+
+# Requests of this blueprint get per-request timing and a Server-Timing header
+INSTRUMENTED_BLUEPRINT = 'api'
+
+# Longest statement text written to the slow-query log
+_MAX_STATEMENT_LENGTH = 2000
+
+
+class RequestTiming:
+    """SQL statement count/time and serialization (row to dict, JSON encoding) time of one request"""
+
+    __slots__ = ('started', 'queries', 'db_time', 'serialize_time', 'serializing')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+
+    def server_timing(self):
+        """Server-Timing header value (durations in milliseconds)"""
+        total = time.perf_counter() - self.started
+        return (f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries", '
+                f'serialize;dur={self.serialize_time * 1000:.2f}, '
+                f'total;dur={total * 1000:.2f}')
+
+
+def _current_timing():
+    return g.get('request_timing') if has_request_context() else None
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Add the time spent in the block to the request's serialize timing, minus the SQL
+    it ran (e.g. member queries issued while serializing rows); nested blocks count once
+    A no-op outside instrumented requests (and in the ASGI app)
+    """
+    timing = _current_timing()
+    if timing is None or timing.serializing:
+        yield
+        return
+
+    started, db_time = time.perf_counter(), timing.db_time
+    timing.serializing = True
+    try:
+        yield
+    finally:
+        timing.serializing = False
+        timing.serialize_time += time.perf_counter() - started - (timing.db_time - db_time)
+
+
+def log_stream_timing():
+    """
+    Log a streamed response's timing once its body is complete - its Server-Timing
+    header went out before the body and only covers the time until then
+    """
+    timing = _current_timing()
+    if timing is None:
+        return
+    logger.info(json.dumps({
+        'event': 'stream_timing',
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'queries': timing.queries,
+        'db_ms': round(timing.db_time * 1000, 2),
+        'serialize_ms': round(timing.serialize_time * 1000, 2),
+        'total_ms': round((time.perf_counter() - timing.started) * 1000, 2),
+    }))
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """FastJSONProvider that adds the time spent encoding jsonify() responses to the request timing"""
+
+    def response(self, *args, **kwargs):
+        with timed_serialization():
+            return super().response(*args, **kwargs)
+
+
+def redact_parameters(parameters):
+    """Replace bound values by their type names, keeping the parameter names/positions"""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f'<{len(parameters)} parameter sets>'
+        return [type(value).__name__ for value in parameters]
+    return None if parameters is None else type(parameters).__name__
+
+
+def _log_slow_query(statement, parameters, duration, executemany):
+    record = {
+        'event': 'slow_query',
+        'duration_ms': round(duration * 1000, 2),
+        'statement': ' '.join(statement.split())[:_MAX_STATEMENT_LENGTH],
+        'parameters': redact_parameters(parameters),
+        'executemany': executemany,
+    }
+    if has_request_context():
+        record.update({'method': request.method, 'path': request.path, 'endpoint': request.endpoint})
+    logger.warning(json.dumps(record))
+
+
+def instrument_engine(engine, slow_query_threshold):
+    """Time every statement on engine: add it to the request timing, log it when slow"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _end_statement(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['statement_started'].pop()
+
+        timing = _current_timing()
+        if timing is not None:
+            timing.queries += 1
+            timing.db_time += duration
+
+        if duration >= slow_query_threshold:
+            _log_slow_query(statement, parameters, duration, executemany)
+
+    @event.listens_for(engine, 'handle_error')
+    def _discard_statement(context):
+        started = context.connection.info.get('statement_started') if context.connection else None
+        if started:
+            started.pop()
+
+
+def init_instrumentation(app):
+    """
+    Install the SQL/serialization instrumentation when SQL_INSTRUMENTATION is set
+    Nothing is registered otherwise, so the disabled feature costs nothing per request
+    """
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    app.json = TimedJSONProvider(app)
+    threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine, threshold)
+
+    @app.before_request
+    def _start_request_timing():
+        if request.blueprint == INSTRUMENTED_BLUEPRINT:
+            g.request_timing = RequestTiming()
+
+    @app.after_request
+    def _add_server_timing(response):
+        timing = g.get('request_timing')
+        if timing is not None:
+            response.headers['Server-Timing'] = timing.server_timing()
+        return response
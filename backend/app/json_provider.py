@@ -0,0 +1,72 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency - fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(obj):
+    """Encode the types our responses contain that JSON has no native type for"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, uuid.UUID)):
+        return str(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson when it is installed, stdlib json otherwise
+    Datetimes are written as ISO 8601 strings (matching the models' to_dict)
+    Output is compact unless JSON_PRETTYPRINT is set; JSON_SORT_KEYS sorts object keys
+    """
+
+    mimetype = 'application/json'
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.pretty = app.config.get('JSON_PRETTYPRINT', False)
+        self.sort_keys = app.config.get('JSON_SORT_KEYS', False)
+
+        self._options = 0
+        if orjson is not None:
+            if self.pretty:
+                self._options |= orjson.OPT_INDENT_2
+            if self.sort_keys:
+                self._options |= orjson.OPT_SORT_KEYS
+
+    @property
+    def backend(self):
+        return 'orjson' if orjson is not None else 'json'
+
+    def dumps_bytes(self, obj):
+        """Serialize obj to UTF-8 encoded JSON bytes"""
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=self._options)
+        return self.dumps(obj).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=self._options).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        if self.pretty:
+            kwargs.setdefault('indent', 2)
+        else:
+            kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
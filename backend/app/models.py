@@ -1,5 +1,7 @@
 from app import db
 from datetime import datetime
+from collections import Counter
+from sqlalchemy import case, event, func, inspect, select
 
 
 class Family(db.Model):
@@ -7,6 +9,16 @@ class Family(db.Model):
     
     __tablename__ = 'families'
     
+    # Composite index backing keyset pagination on (created_at, id), plus
+    # PostgreSQL-only pg_trgm indexes for fuzzy/substring search
+    __table_args__ = (
+        db.Index('ix_families_created_at_id', 'created_at', 'id'),
+        db.Index('ix_families_family_name_trgm', 'family_name', postgresql_using='gin',
+                 postgresql_ops={'family_name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_families_address_trgm', 'address', postgresql_using='gin',
+                 postgresql_ops={'address': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+    
     # Columns
     id = db.Column(db.Integer, primary_key=True)
     family_name = db.Column(db.String(200), nullable=False)
@@ -14,9 +26,18 @@ class Family(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Denormalized member count, maintained with the aggregate counters on every flush
+    member_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Data version of the last write to this family or its members (see /api/changes)
+    sync_version = db.Column(db.BigInteger, nullable=False, default=0, server_default='0', index=True)
+    
     # Relationship - one family has many members
     # cascade='all, delete-orphan' means when family is deleted, all members are deleted too
-    members = db.relationship('Person', backref='family', cascade='all, delete-orphan', lazy=True)
+    # Loaded on access; bulk read paths ask for selectinload(Family.members), which
+    # loads a whole batch's members in one extra query (avoids the N+1 problem)
+    members = db.relationship('Person', backref='family', cascade='all, delete-orphan',
+                              lazy=True, order_by='Person.id')
     
     def to_dict(self):
         """Convert family object to dictionary"""
@@ -39,6 +60,12 @@ class Person(db.Model):
     
     __tablename__ = 'persons'
     
+    # PostgreSQL-only pg_trgm index for fuzzy/substring search on member names
+    __table_args__ = (
+        db.Index('ix_persons_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+    
     # Columns
     id = db.Column(db.Integer, primary_key=True)
     family_id = db.Column(db.Integer, db.ForeignKey('families.id'), nullable=False)
@@ -46,6 +73,9 @@ class Person(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Data version of the last write to this person (see /api/changes)
+    sync_version = db.Column(db.BigInteger, nullable=False, default=0, server_default='0', index=True)
+    
     def to_dict(self):
         """Convert person object to dictionary"""
         return {
@@ -58,3 +88,296 @@ class Person(db.Model):
     
     def __repr__(self):
         return f'<Person {self.name}>'
+
+
+# Columns and indexes created by PostgreSQL-only migrations and deliberately not mapped
+# on the models; kept out of autogenerate so 'flask db migrate' never drops them
+UNMAPPED_SCHEMA_OBJECTS = {
+    'search_vector',
+    'ix_families_search_vector',
+    'ix_persons_search_vector',
+}
+
+
+# Indexes mapped with ddl_if(dialect='postgresql'), which autogenerate does not honour;
+# f5b17c3a9e24 owns them, so they are never compared in either direction
+POSTGRESQL_ONLY_INDEXES = {
+    'ix_families_family_name_trgm',
+    'ix_families_address_trgm',
+    'ix_persons_name_trgm',
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Alembic autogenerate filter that skips UNMAPPED_SCHEMA_OBJECTS and POSTGRESQL_ONLY_INDEXES"""
+    if type_ == 'index' and name in POSTGRESQL_ONLY_INDEXES:
+        return False
+    return not (reflected and compare_to is None and name in UNMAPPED_SCHEMA_OBJECTS)
+
+
+class DataVersion(db.Model):
+    """
+    Single-row table holding a counter that every family/person write bumps
+    Writers hold its row lock until they commit, so versions become visible in
+    order and double as sync tokens for /api/changes
+    """
+    
+    __tablename__ = 'data_version'
+    
+    # Columns
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Oldest sync token still served incrementally; older tokens may have missed
+    # pruned tombstones (or a clear_data) and must resync from scratch
+    sync_floor = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    
+    @classmethod
+    def current_select(cls):
+        """Select of the (version, updated_at) row, for sessions other than db.session"""
+        return db.select(cls.version, cls.updated_at).where(cls.id == 1)
+    
+    @classmethod
+    def sync_state_select(cls):
+        """Select of the (version, sync_floor) row, for sessions other than db.session"""
+        return db.select(cls.version, cls.sync_floor).where(cls.id == 1)
+    
+    @classmethod
+    def current(cls):
+        """Return (version, updated_at) - (0, None) before the first write"""
+        row = db.session.execute(cls.current_select()).first()
+        return (row.version, row.updated_at) if row else (0, None)
+    
+    @classmethod
+    def sync_state(cls):
+        """Return (version, sync_floor) - (0, 0) before the first write"""
+        row = db.session.execute(cls.sync_state_select()).first()
+        return (row.version, row.sync_floor) if row else (0, 0)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.version}>'
+
+
+def bump_data_version(connection):
+    """
+    Increment the global data version on the given connection (same transaction)
+    Returns: the new version
+    """
+    table = DataVersion.__table__
+    now = datetime.utcnow()
+    
+    version = connection.execute(
+        table.update().where(table.c.id == 1)
+        .values(version=table.c.version + 1, updated_at=now)
+        .returning(table.c.version)
+    ).scalar()
+    if version is None:
+        version = 1
+        connection.execute(table.insert().values(id=1, version=version, updated_at=now))
+    return version
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_data_version_on_write(session, flush_context, instances):
+    """
+    Bump the data version whenever a flush inserts, updates or deletes families/persons
+    Written rows are stamped here so the version rides on their own INSERT/UPDATE;
+    it is also left in session.info for _update_families_on_write
+    """
+    written = [obj for obj in session.new if isinstance(obj, (Family, Person))]
+    written += [obj for obj in session.dirty
+                if isinstance(obj, (Family, Person)) and session.is_modified(obj)]
+    deleted = any(isinstance(obj, (Family, Person)) for obj in session.deleted)
+    if not written and not deleted:
+        return
+    
+    version = bump_data_version(session.connection())
+    for obj in written:
+        obj.sync_version = version
+    session.info['data_version'] = version
+
+
+class Tombstone(db.Model):
+    """A deleted family or person, kept so /api/changes can report the removal"""
+    
+    __tablename__ = 'tombstones'
+    
+    # Columns
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # 'family' or 'person'
+    entity_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.BigInteger, nullable=False, index=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Tombstone {self.entity} {self.entity_id}>'
+
+
+def reset_sync(connection, before=None):
+    """
+    Drop tombstones (all, or those deleted before the given datetime) and raise the
+    sync floor so clients holding older tokens are told to resync from scratch
+    Returns: number of tombstones removed
+    """
+    tombstones = Tombstone.__table__
+    table = DataVersion.__table__
+    
+    query = select(func.max(tombstones.c.version), func.count(tombstones.c.id))
+    if before is not None:
+        query = query.where(tombstones.c.deleted_at < before)
+    floor, removed = connection.execute(query).one()
+    
+    if before is None:
+        # Everything goes, including changes made without tombstones (bulk deletes)
+        floor = select(table.c.version).where(table.c.id == 1).scalar_subquery()
+    elif floor is None:
+        return 0
+    
+    delete = tombstones.delete()
+    if before is not None:
+        delete = delete.where(tombstones.c.deleted_at < before)
+    connection.execute(delete)
+    connection.execute(table.update().where(table.c.id == 1).values(sync_floor=floor))
+    return removed
+
+
+class Counters(db.Model):
+    """Single-row table of aggregate counts, so /api/stats never scans the big tables"""
+    
+    __tablename__ = 'counters'
+    
+    # Columns
+    id = db.Column(db.Integer, primary_key=True)
+    total_families = db.Column(db.BigInteger, nullable=False, default=0)
+    total_guests = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    @classmethod
+    def current(cls):
+        """Return (total_families, total_guests), or None if the row does not exist yet"""
+        row = db.session.execute(
+            db.select(cls.total_families, cls.total_guests).where(cls.id == 1)
+        ).first()
+        return (row.total_families, row.total_guests) if row else None
+    
+    def __repr__(self):
+        return f'<Counters families={self.total_families} guests={self.total_guests}>'
+
+
+def rebuild_counters(connection):
+    """
+    Recompute the aggregate counters and every family's member_count from scratch
+    Use after bulk operations that bypass the ORM, or if the counters drift
+    """
+    families = Family.__table__
+    persons = Person.__table__
+    counters = Counters.__table__
+    
+    member_count = select(func.count(persons.c.id)) \
+        .where(persons.c.family_id == families.c.id).scalar_subquery()
+    # Pass updated_at through so Core's onupdate does not restamp every family
+    connection.execute(families.update().values(member_count=member_count, updated_at=families.c.updated_at))
+    
+    total_families = connection.execute(select(func.count(families.c.id))).scalar()
+    total_guests = connection.execute(select(func.count(persons.c.id))).scalar()
+    
+    result = connection.execute(
+        counters.update().where(counters.c.id == 1)
+        .values(total_families=total_families, total_guests=total_guests)
+    )
+    if result.rowcount == 0:
+        connection.execute(counters.insert().values(
+            id=1, total_families=total_families, total_guests=total_guests
+        ))
+    
+    return total_families, total_guests
+
+
+def add_to_counters(connection, families_delta, guests_delta):
+    """
+    Adjust the aggregate counters by the given deltas on the given connection
+    Bulk inserts that bypass the ORM call this directly
+    """
+    counters = Counters.__table__
+    result = connection.execute(
+        counters.update().where(counters.c.id == 1).values(
+            total_families=counters.c.total_families + families_delta,
+            total_guests=counters.c.total_guests + guests_delta
+        )
+    )
+    if result.rowcount == 0:
+        rebuild_counters(connection)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _update_families_on_write(session, flush_context):
+    """
+    Apply a flush's side effects on families in the same transaction: the aggregate
+    counter deltas, one UPDATE for every family whose members were added, changed,
+    moved or removed (member_count delta, updated_at so the family's (id, updated_at)
+    pair validates its whole representation, and this flush's sync_version) and
+    tombstones for deleted families/persons
+    """
+    version = session.info.pop('data_version', None)
+    if version is None:
+        return
+    
+    families_delta = 0
+    member_deltas = Counter()
+    touched, created = set(), set()
+    tombstones = []
+    
+    for obj in session.new:
+        if isinstance(obj, Family):
+            families_delta += 1
+            created.add(obj.id)
+        elif isinstance(obj, Person):
+            member_deltas[obj.family_id] += 1
+            touched.add(obj.family_id)
+    
+    for obj in session.deleted:
+        if isinstance(obj, Family):
+            families_delta -= 1
+            tombstones.append({'entity': 'family', 'entity_id': obj.id})
+        elif isinstance(obj, Person):
+            member_deltas[obj.family_id] -= 1
+            touched.add(obj.family_id)
+            tombstones.append({'entity': 'person', 'entity_id': obj.id})
+    
+    for obj in session.dirty:
+        if isinstance(obj, Person) and session.is_modified(obj):
+            touched.add(obj.family_id)
+            # A person moved to another family
+            history = inspect(obj).attrs.family_id.history
+            if history.has_changes():
+                for old_family_id in history.deleted:
+                    member_deltas[old_family_id] -= 1
+                    touched.add(old_family_id)
+                for new_family_id in history.added:
+                    member_deltas[new_family_id] += 1
+    
+    member_deltas = {family_id: delta for family_id, delta in member_deltas.items() if delta}
+    touched.discard(None)
+    connection = session.connection()
+    families = Family.__table__
+    
+    if touched:
+        # Families inserted by this flush already carry their timestamps and version
+        updated_at = datetime.utcnow()
+        if created & touched:
+            updated_at = case((families.c.id.in_(created), families.c.updated_at), else_=updated_at)
+        values = {'updated_at': updated_at, 'sync_version': version}
+        if member_deltas:
+            values['member_count'] = families.c.member_count + \
+                case(member_deltas, value=families.c.id, else_=0)
+        connection.execute(families.update().where(families.c.id.in_(touched)).values(**values))
+    
+    if families_delta or member_deltas:
+        add_to_counters(connection, families_delta, sum(member_deltas.values()))
+    
+    if tombstones:
+        now = datetime.utcnow()
+        connection.execute(
+            Tombstone.__table__.insert(),
+            [dict(tombstone, version=version, deleted_at=now) for tombstone in tombstones]
+        )
@@ -0,0 +1,186 @@
+import itertools
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, select
+
+
+logger = logging.getLogger(__name__)
+
+# SQLALCHEMY_BINDS keys of the read replicas start with this prefix
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Set in session.info once the session has flushed: the rest of the request stays on the primary
+_WROTE_KEY = 'replica_routing_wrote'
+
+
+class RoutingSession(Session):
+    """
+    db.session class that sends reads to the replica picked for the current request
+    (g.db_replica, set by @read_replica) until the session writes anything; flushes,
+    and every read after them, go to the primary
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not self.info.get(_WROTE_KEY) and has_app_context():
+            replica = g.get('db_replica')
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+class ReplicaRouter:
+    """
+    Round-robin over the replica binds, skipping replicas that lag the primary
+    Lag comes from the data_version row every write bumps: 0 when a replica has the
+    primary's version, else how far its last replayed write trails the primary's.
+    It is measured at most every check_interval seconds per process, on dedicated
+    connections; a replica that cannot be reached counts as lagging
+    """
+
+    def __init__(self, engines, max_lag, check_interval):
+        """engines: callable returning db.engines (available once the app context exists)"""
+        self._engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lags = {}
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._cycle = None
+
+    def replica_keys(self):
+        return sorted(key for key in self._engines() if key and key.startswith(REPLICA_BIND_PREFIX))
+
+    def pick(self):
+        """Bind key of a replica within max_lag, or None to use the primary"""
+        lags = self.lags()
+        if self._cycle is None:
+            self._cycle = itertools.cycle(self.replica_keys())
+        for _ in range(len(lags)):
+            key = next(self._cycle)
+            if lags.get(key) is not None and lags[key] <= self.max_lag:
+                return key
+        return None
+
+    def lags(self):
+        """{bind key: lag in seconds, or None when unreachable}, refreshed when stale"""
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            # One thread refreshes; the others keep routing on the previous result
+            if self._lock.acquire(blocking=self._checked_at is None):
+                try:
+                    self._lags = self._measure()
+                    self._checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return self._lags
+
+    def _measure(self):
+        engines = self._engines()
+        try:
+            primary = self._data_version(engines[None])
+        except Exception as e:
+            logger.warning(f'Replica lag check failed on the primary: {e}')
+            return {key: None for key in self.replica_keys()}
+
+        lags = {}
+        for key in self.replica_keys():
+            try:
+                replica = self._data_version(engines[key])
+            except Exception as e:
+                logger.warning(f'Replica {key} is unreachable: {e}')
+                lags[key] = None
+                continue
+            lags[key] = self._lag(primary, replica)
+        return lags
+
+    def version(self, key):
+        """Data version on the given bind (None for the primary), 0 before the first write"""
+        row = self._data_version(self._engines()[key])
+        return row.version if row else 0
+
+    @staticmethod
+    def _data_version(engine):
+        from app.models import DataVersion
+        with engine.connect() as connection:
+            return connection.execute(
+                select(DataVersion.version, DataVersion.updated_at).where(DataVersion.id == 1)
+            ).first()
+
+    @staticmethod
+    def _lag(primary, replica):
+        if primary is None or (replica is not None and replica.version >= primary.version):
+            return 0.0
+        if replica is None or replica.updated_at is None or primary.updated_at is None:
+            return float('inf')
+        return max((primary.updated_at - replica.updated_at).total_seconds(), 0.0)
+
+    def status(self):
+        return {
+            'max_lag': self.max_lag,
+            'lag': {key: (None if lag is None or lag == float('inf') else round(lag, 3))
+                    for key, lag in self.lags().items()},
+        }
+
+
+def create_replica_router(app):
+    """Build the router when SQLALCHEMY_BINDS has replica binds, else None"""
+    if not any(key.startswith(REPLICA_BIND_PREFIX) for key in app.config['SQLALCHEMY_BINDS']):
+        return None
+    db = app.extensions['sqlalchemy']
+    return ReplicaRouter(
+        lambda: db.engines,
+        app.config['DB_REPLICA_MAX_LAG'],
+        app.config['DB_REPLICA_LAG_CHECK_INTERVAL']
+    )
+
+
+def read_replica(view):
+    """
+    Serve a read-only view from a replica when one is configured and within lag
+    Any write the view makes moves the rest of the request to the primary
+    """
+
+    @wraps(view)
+    def wrapper(**kwargs):
+        router = current_app.extensions.get('replica_router')
+        if router is not None:
+            g.db_replica = router.pick()
+            # Read before the view runs, for replica_is_current() when caching its response
+            if g.db_replica is not None and current_app.extensions.get('response_cache') is not None:
+                try:
+                    g.db_replica_version = router.version(g.db_replica)
+                except Exception as e:
+                    logger.warning(f'Replica {g.db_replica} version check failed: {e}')
+        return view(**kwargs)
+
+    return wrapper
+
+
+def replica_is_current():
+    """
+    Whether the current request's reads include every write committed on the primary
+    by the time the view finished - always true on the primary. A lagging replica
+    can still be within max_lag, and a response built from it must not be cached
+    under the newer cache generations the primary's writes already bumped
+    """
+    replica = g.get('db_replica')
+    if replica is None:
+        return True
+    replica_version = g.get('db_replica_version')
+    if replica_version is None:
+        return False
+    try:
+        primary_version = current_app.extensions['replica_router'].version(None)
+    except Exception as e:
+        logger.warning(f'Replica version check failed on the primary: {e}')
+        return False
+    return replica_version >= primary_version
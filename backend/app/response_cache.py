@@ -0,0 +1,265 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, Response, has_app_context
+from sqlalchemy import event, inspect
+from app import db
+from app.models import Family, Person
+from app.replicas import replica_is_current
+
+
+# Supported backends for Config.RESPONSE_CACHE_BACKEND ('none' disables the cache)
+RESPONSE_CACHE_BACKENDS = ('none', 'memory', 'redis')
+
+# Tag carried by every entry; bumping it drops the whole cache (e.g. after clear_data)
+ALL_TAG = 'all'
+
+# Headers never replayed from the cache
+_SKIPPED_HEADERS = {'content-length', 'set-cookie'}
+
+
+class MemoryBackend:
+    """Bounded in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, tags):
+        with self._lock:
+            return [self._generations.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shared cache on a Redis-compatible server (needs the optional 'redis' package)
+    Entries expire through Redis TTLs; memory is bounded by the server's maxmemory policy
+    """
+
+    def __init__(self, url, ttl, prefix='wedding-api:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data['status'], [tuple(header) for header in data['headers']], \
+            base64.b64decode(data['body'])
+
+    def set(self, key, value):
+        status, headers, body = value
+        raw = json.dumps({
+            'status': status,
+            'headers': headers,
+            'body': base64.b64encode(body).decode('ascii')
+        })
+        self.client.set(self.prefix + key, raw, ex=self.ttl)
+
+    def generations(self, tags):
+        values = self.client.mget([f'{self.prefix}gen:{tag}' for tag in tags])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, tags):
+        pipe = self.client.pipeline()
+        for tag in tags:
+            pipe.incr(f'{self.prefix}gen:{tag}')
+        pipe.execute()
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+    """
+    Tag-invalidated response cache for read endpoints
+    Each entry's key embeds the current generation of its tags (e.g. 'families',
+    'family:12', 'stats'); writes bump the generations of the tags they affect, so
+    stale entries are never looked up again and simply age out
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, tags):
+        """Key for the current Flask request"""
+        return self.make_key(request.endpoint, request.view_args,
+                             request.args.items(multi=True), tags)
+
+    def make_key(self, endpoint, view_args, args, tags):
+        """
+        Key from the endpoint name ('api.get_family'), URL arguments, (name, value)
+        query pairs and tags - shared by the Flask and ASGI read paths
+        """
+        generations = self.backend.generations([ALL_TAG, *tags])
+        query = '&'.join(f'{name}={value}' for name, value in sorted(args))
+        stamp = '.'.join(str(generation) for generation in generations)
+        return f'{endpoint}:{view_args}:{query}:{stamp}'
+
+    def invalidate(self, tags):
+        if tags:
+            self.backend.bump(sorted(tags))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 3) if total else 0,
+            'entries': self.backend.size()
+        }
+
+
+def create_response_cache(config):
+    """Build the ResponseCache selected by Config, or None when disabled"""
+    backend = config['RESPONSE_CACHE_BACKEND']
+    if backend == 'memory':
+        return ResponseCache(MemoryBackend(
+            config['RESPONSE_CACHE_MAX_ENTRIES'], config['RESPONSE_CACHE_TTL']
+        ))
+    if backend == 'redis':
+        return ResponseCache(RedisBackend(
+            config['RESPONSE_CACHE_REDIS_URL'], config['RESPONSE_CACHE_TTL']
+        ))
+    if backend != 'none':
+        raise ValueError(f'Unknown response cache backend: {backend}')
+    return None
+
+
+def cached(tags):
+    """
+    Cache a GET view's successful responses
+    tags: callable receiving the view's URL arguments and returning the cache tags
+    Streamed responses, non-200 statuses and responses from a lagging replica are never cached
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if cache is None:
+                return view(**kwargs)
+
+            key = cache.key(tags(**kwargs))
+            entry = cache.backend.get(key)
+            if entry is not None:
+                cache.hits += 1
+                status, headers, body = entry
+                response = Response(body, status=status, headers=headers)
+                response.headers['X-Cache'] = 'HIT'
+                return response.make_conditional(request)
+
+            cache.misses += 1
+            response = current_app.make_response(view(**kwargs))
+            # Responses read from a replica that trailed the primary are served, not stored
+            if response.status_code == 200 and not response.is_streamed and replica_is_current():
+                headers = [(name, value) for name, value in response.headers.items()
+                           if name.lower() not in _SKIPPED_HEADERS]
+                cache.backend.set(key, (200, headers, response.get_data()))
+            response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# ==================== INVALIDATION ====================
+# Tags touched by a flush are collected, then invalidated once the transaction commits
+
+_PENDING_KEY = 'response_cache_pending'
+
+
+def _current_cache():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('response_cache')
+
+
+def tags_for_families(family_ids, counts_changed=True):
+    """Cache tags affected by writes to the given families (or their members)"""
+    tags = {'families'} | {f'family:{family_id}' for family_id in family_ids}
+    if counts_changed:
+        tags.add('stats')
+    return tags
+
+
+def invalidate(tags=(ALL_TAG,)):
+    """
+    Invalidate tags right away - for writes that bypass the ORM unit of work
+    (bulk inserts, CLI maintenance), called after they commit
+    """
+    cache = _current_cache()
+    if cache is not None:
+        cache.invalidate(tags)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_tags(session, flush_context):
+    if _current_cache() is None:
+        return
+    tags = session.info.setdefault(_PENDING_KEY, set())
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Family):
+            tags |= tags_for_families([obj.id])
+        elif isinstance(obj, Person):
+            tags |= tags_for_families([obj.family_id])
+
+    for obj in session.dirty:
+        if isinstance(obj, Family):
+            tags |= tags_for_families([obj.id], counts_changed=False)
+        elif isinstance(obj, Person):
+            moved_from = inspect(obj).attrs.family_id.history.deleted or ()
+            tags |= tags_for_families([obj.family_id, *moved_from], counts_changed=bool(moved_from))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_tags(session):
+    tags = session.info.pop(_PENDING_KEY, None)
+    if tags:
+        invalidate(tags)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_tags(session):
+    session.info.pop(_PENDING_KEY, None)
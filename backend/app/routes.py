@@ -1,31 +1,208 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, current_app, Response, stream_with_context
+from sqlalchemy.orm import selectinload
 from app import db
-from app.models import Family, Person
-from app.utils import generate_excel_export, generate_csv_export
+from app.models import Family, Person, DataVersion, Counters
+from app.bulk import parse_family_entry, insert_families, publish_inserted_families
+from app.importer import IMPORT_FORMATS, parse_rows, iter_csv_rows, iter_xlsx_rows
+from app.search import family_matches, search_settings
+from app.response_cache import cached
+from app.events import RESYNC, thread_client_limit
+from app.db_pool import pool_status
+from app.replicas import read_replica
+from app.instrumentation import timed_serialization, log_stream_timing
+from app.sync import ChangeQueries, parse_sync_token, group_tombstones
+from app.validators import data_validators, family_validators, is_not_modified, validator_headers
+from app.serializers import (
+    FamilyProjection, serialize_person_rows, page_statement, split_page
+)
+from app.utils import (
+    validate_person_data,
+    generate_excel_export, generate_excel_export_pandas, stream_csv_export, export_filename,
+    summarize_family_sizes, CSV_LAYOUTS
+)
 from datetime import datetime
+from zipfile import BadZipFile
 
 # Create Blueprint
 bp = Blueprint('api', __name__, url_prefix='/api')
 
 
+# ==================== HELPERS ====================
+
+def _flag(name):
+    """Read a boolean query-string flag such as ?all=1"""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _page_limit():
+    """Read ?limit= clamped to the configured page size bounds"""
+    limit = request.args.get('limit', current_app.config['FAMILIES_PAGE_SIZE'], type=int)
+    return max(1, min(limit, current_app.config['FAMILIES_MAX_PAGE_SIZE']))
+
+
+def _data_validators(prefix):
+    """
+    ETag/Last-Modified for responses that change whenever any family/person changes
+    Returns: (etag, last_modified) from the global data version
+    """
+    return data_validators(prefix, *DataVersion.current())
+
+
+def _is_not_modified(etag, last_modified):
+    """Check If-None-Match (preferred) or If-Modified-Since against the validators"""
+    return is_not_modified(request.headers.get('If-None-Match'),
+                           request.headers.get('If-Modified-Since'), etag, last_modified)
+
+
+def _with_validators(response, etag, last_modified):
+    """Attach ETag/Last-Modified and ask clients to revalidate before reusing the body"""
+    response.headers.update(validator_headers(etag, last_modified))
+    return response
+
+
+def _not_modified(etag, last_modified):
+    """Empty 304 response carrying the current validators"""
+    return _with_validators(Response(status=304), etag, last_modified)
+
+
+def _paginate_families(query):
+    """
+    Apply keyset pagination on (created_at, id) to a FamilyProjection select
+    Returns: (rows, next_cursor) - raises ValueError on a bad cursor
+    """
+    limit = _page_limit()
+    rows = db.session.execute(page_statement(query, limit, request.args.get('cursor'))).all()
+    return split_page(rows, limit)
+
+
+def _iter_family_batches(query):
+    """
+    Run a Family query on a server-side cursor and yield it batch by batch
+    Each batch is expunged from the session once the caller has moved on,
+    so only STREAM_BATCH_SIZE families are held in memory at a time
+    """
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+    result = db.session.execute(query.statement.execution_options(yield_per=batch_size))
+    
+    for batch in result.scalars().partitions():
+        yield batch
+        for family in batch:
+            db.session.expunge(family)
+
+
+def _iter_families(query):
+    """Yield families one at a time from _iter_family_batches"""
+    for batch in _iter_family_batches(query):
+        yield from batch
+
+
+def _stream_families(query, projection, ndjson=False):
+    """
+    Stream a FamilyProjection select as a JSON array (or NDJSON) straight from a
+    server-side cursor, STREAM_BATCH_SIZE rows (plus one member query) at a time
+    """
+    dumps = current_app.json.dumps
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+    
+    def generate():
+        first = True
+        
+        if not ndjson:
+            yield '['
+        
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for batch in result.partitions():
+            with timed_serialization():
+                encoded = [dumps(family) for family in projection.serialize(batch)]
+            
+            if ndjson:
+                yield ''.join(item + '\n' for item in encoded)
+            else:
+                yield ('' if first else ',') + ','.join(encoded)
+                first = False
+        
+        if not ndjson:
+            yield ']'
+        log_stream_timing()
+    
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
 # ==================== FAMILY ROUTES ====================
 
 @bp.route('/families', methods=['GET'])
+@cached(lambda: ['families'])
+@read_replica
 def get_families():
-    """Get all families with their members"""
+    """
+    Get families with their members, newest first
+    Paginated with ?limit=&cursor=; pass ?all=1 for the full unpaginated list
+    or ?stream=1 (optionally &format=ndjson) to stream the full list
+    ?fields=id,family_name,... selects a sparse fieldset (members only with
+    ?include=members or fields=members)
+    """
     try:
-        families = Family.query.order_by(Family.created_at.desc()).all()
-        return jsonify([family.to_dict() for family in families]), 200
+        # Answer revalidations from the data version alone, before touching families
+        etag, last_modified = _data_validators('families')
+        if _is_not_modified(etag, last_modified):
+            return _not_modified(etag, last_modified)
+        
+        projection = FamilyProjection.from_request(request.args)
+        query = projection.select()
+        
+        if _flag('stream'):
+            response = _stream_families(
+                query.order_by(Family.created_at.desc(), Family.id.desc()),
+                projection,
+                ndjson=request.args.get('format') == 'ndjson'
+            )
+            return _with_validators(response, etag, last_modified)
+        
+        if _flag('all'):
+            rows = db.session.execute(query.order_by(Family.created_at.desc())).all()
+            response = jsonify(projection.serialize(rows))
+            return _with_validators(response, etag, last_modified), 200
+        
+        rows, next_cursor = _paginate_families(query)
+        response = jsonify({
+            'families': projection.serialize(rows),
+            'next_cursor': next_cursor
+        })
+        return _with_validators(response, etag, last_modified), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @bp.route('/families/<int:id>', methods=['GET'])
+@cached(lambda id: [f'family:{id}'])
+@read_replica
 def get_family(id):
-    """Get a single family by ID"""
+    """
+    Get a single family by ID (304 when If-None-Match/If-Modified-Since still match)
+    Accepts ?fields= and ?include=members like /families
+    """
     try:
-        family = Family.query.get_or_404(id)
-        return jsonify(family.to_dict()), 200
+        projection = FamilyProjection.from_request(request.args)
+        
+        # Validate on the family row alone, before loading members
+        row = db.session.execute(
+            projection.select().add_columns(Family.updated_at.label('etag_updated_at'))
+            .where(Family.id == id)
+        ).one_or_none()
+        if row is None:
+            return jsonify({'error': 'Family not found'}), 404
+        
+        etag, last_modified = family_validators(id, row.etag_updated_at)
+        if _is_not_modified(etag, last_modified):
+            return _not_modified(etag, last_modified)
+        
+        family = projection.serialize([row])[0]
+        return _with_validators(jsonify(family), etag, last_modified), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
@@ -108,6 +285,51 @@ def delete_family(id):
         return jsonify({'error': str(e)}), 500
 
 
+@bp.route('/families/bulk', methods=['POST'])
+def create_families_bulk():
+    """
+    Create many families with nested members in one transaction
+    Body: [{"family_name": ..., "address": ..., "members": ["Name", ...]}, ...]
+    Invalid entries are skipped and reported; valid ones are inserted with batched
+    multi-row INSERTs. Returns one result per entry, in request order
+    """
+    try:
+        data = request.json
+        if not isinstance(data, list):
+            return jsonify({'error': 'Expected a JSON array of families'}), 400
+        
+        results = [None] * len(data)
+        indexes = []
+        entries = []
+        for index, item in enumerate(data):
+            entry, error = parse_family_entry(item)
+            if error:
+                results[index] = {'index': index, 'error': error}
+            else:
+                indexes.append(index)
+                entries.append(entry)
+        
+        if not entries:
+            return jsonify({'created': 0, 'failed': len(data), 'results': results}), 400
+        
+        family_ids, person_rows = insert_families(entries)
+        db.session.commit()
+        publish_inserted_families(entries, family_ids, person_rows)
+        
+        for index, family_id, (_, _, member_names) in zip(indexes, family_ids, entries):
+            results[index] = {'index': index, 'id': family_id, 'member_count': len(member_names)}
+        
+        return jsonify({
+            'created': len(family_ids),
+            'failed': len(data) - len(family_ids),
+            'results': results
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 # ==================== PERSON ROUTES ====================
 
 @bp.route('/persons', methods=['POST'])
@@ -122,9 +344,9 @@ def create_person():
         if not data.get('name'):
             return jsonify({'error': 'Name is required'}), 400
         
-        # Check if family exists
-        family = Family.query.get(data['family_id'])
-        if not family:
+        # Check if family exists (id only - its members are not needed here)
+        family_id = db.session.scalar(db.select(Family.id).where(Family.id == data['family_id']))
+        if family_id is None:
             return jsonify({'error': 'Family not found'}), 404
         
         # Create new person
@@ -188,19 +410,168 @@ def delete_person(id):
         return jsonify({'error': str(e)}), 500
 
 
+# Operations accepted by /api/persons/batch
+PERSON_BATCH_OPS = ('create', 'update', 'delete')
+
+
+def _validate_person_op(op):
+    """
+    Validate one /api/persons/batch operation (shape only, no database access)
+    Returns: error message or None
+    """
+    if not isinstance(op, dict) or op.get('op') not in PERSON_BATCH_OPS:
+        return f'op must be one of: {", ".join(PERSON_BATCH_OPS)}'
+    
+    try:
+        if op['op'] == 'create':
+            return validate_person_data(op)[1]
+        
+        if not isinstance(op.get('id'), int) or op['id'] <= 0:
+            return 'Person ID must be a positive integer'
+        if op['op'] == 'update':
+            return validate_person_data(op, require_family_id=False)[1]
+        return None
+    except (AttributeError, TypeError):
+        return 'Invalid person data'
+
+
+@bp.route('/persons/batch', methods=['POST'])
+def batch_persons():
+    """
+    Apply a list of person creates, updates and deletes atomically with one commit
+    Body: [{"op": "create", "family_id": 1, "name": ...},
+           {"op": "update", "id": 5, "name": ...}, {"op": "delete", "id": 6}]
+    Existence checks are one IN query for families and one for persons
+    Returns: {created: [new ids in request order], updated: [ids], deleted: [ids]}
+    """
+    try:
+        ops = request.json
+        if not isinstance(ops, list):
+            return jsonify({'error': 'Expected a JSON array of operations'}), 400
+        
+        for index, op in enumerate(ops):
+            error = _validate_person_op(op)
+            if error:
+                return jsonify({'error': error, 'index': index}), 400
+        
+        # Each existing person may only be touched once per batch
+        seen = set()
+        for index, op in enumerate(ops):
+            if op['op'] == 'create':
+                continue
+            if op['id'] in seen:
+                return jsonify({'error': f'Person {op["id"]} appears more than once', 'index': index}), 400
+            seen.add(op['id'])
+        
+        family_ids = {int(op['family_id']) for op in ops if op['op'] == 'create'}
+        if family_ids:
+            found = set(db.session.scalars(
+                db.select(Family.id).where(Family.id.in_(family_ids))
+            ))
+            missing = family_ids - found
+            if missing:
+                return jsonify({'error': 'Family not found', 'family_ids': sorted(missing)}), 404
+        
+        persons = {}
+        if seen:
+            persons = {person.id: person for person in db.session.scalars(
+                db.select(Person).where(Person.id.in_(seen))
+            )}
+            missing = seen - persons.keys()
+            if missing:
+                return jsonify({'error': 'Person not found', 'person_ids': sorted(missing)}), 404
+        
+        now = datetime.utcnow()
+        new_persons = []
+        updated = []
+        deleted = []
+        
+        for op in ops:
+            if op['op'] == 'create':
+                person = Person(family_id=int(op['family_id']), name=op['name'].strip())
+                db.session.add(person)
+                new_persons.append(person)
+            elif op['op'] == 'update':
+                person = persons[op['id']]
+                person.name = op['name'].strip()
+                person.updated_at = now
+                updated.append(person.id)
+            else:
+                db.session.delete(persons[op['id']])
+                deleted.append(op['id'])
+        
+        # Read the new ids before commit expires the objects (one refresh per person)
+        db.session.flush()
+        created = [person.id for person in new_persons]
+        db.session.commit()
+        
+        return jsonify({
+            'created': created,
+            'updated': updated,
+            'deleted': deleted
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 # ==================== EXPORT ROUTES ====================
 
+EXCEL_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _export_cache_key(variant):
+    """
+    Build the export cache key for a format variant at the current data version
+    Returns: (cache, key, last_modified) - cache is None when caching is disabled
+    """
+    version, last_modified = DataVersion.current()
+    return current_app.extensions.get('export_cache'), f'{variant}-v{version}', last_modified
+
+
+def _send_cached_export(path, mimetype, key, last_modified, extension):
+    """Serve a cached export file with ETag/Last-Modified (304 when unchanged)"""
+    return send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=export_filename(extension),
+        conditional=True,
+        etag=key,
+        last_modified=last_modified
+    )
+
+
 @bp.route('/export/excel', methods=['GET'])
+@read_replica
 def export_excel():
     """Export guest list as Excel file"""
     try:
-        families = Family.query.order_by(Family.family_name).all()
+        engine = current_app.config['EXCEL_EXPORT_ENGINE']
+        cache, key, last_modified = _export_cache_key(f'xlsx-{engine}')
+        
+        cached_path = cache.get(key) if cache else None
+        if cached_path:
+            return _send_cached_export(cached_path, EXCEL_MIMETYPE, key, last_modified, 'xlsx')
+        
+        query = Family.query.options(selectinload(Family.members)) \
+            .order_by(Family.family_name, Family.id)
         
-        excel_file, filename = generate_excel_export(families)
+        if engine == 'pandas':
+            excel_file, filename = generate_excel_export_pandas(query.all())
+        else:
+            # Write-only workbook fed straight from a server-side cursor
+            excel_file, filename = generate_excel_export(_iter_families(query))
+        
+        if cache:
+            with excel_file:
+                cached_path = cache.put(key, excel_file)
+            return _send_cached_export(cached_path, EXCEL_MIMETYPE, key, last_modified, 'xlsx')
         
         return send_file(
             excel_file,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            mimetype=EXCEL_MIMETYPE,
             as_attachment=True,
             download_name=filename
         )
@@ -210,37 +581,165 @@ def export_excel():
 
 
 @bp.route('/export/csv', methods=['GET'])
+@read_replica
 def export_csv():
-    """Export guest list as CSV file"""
+    """
+    Export guest list as a streamed CSV file
+    ?layout=block (default, grouped per family) or ?layout=table (one row per person)
+    """
     try:
-        families = Family.query.order_by(Family.family_name).all()
+        layout = request.args.get('layout', 'block')
+        if layout not in CSV_LAYOUTS:
+            return jsonify({'error': f'Layout must be one of: {", ".join(CSV_LAYOUTS)}'}), 400
         
-        csv_file, filename = generate_csv_export(families)
+        cache, key, last_modified = _export_cache_key(f'csv-{layout}')
         
-        return send_file(
-            csv_file,
+        cached_path = cache.get(key) if cache else None
+        if cached_path:
+            return _send_cached_export(cached_path, 'text/csv', key, last_modified, 'csv')
+        
+        query = Family.query.options(selectinload(Family.members)) \
+            .order_by(Family.family_name, Family.id)
+        
+        # Stream to the client, writing the same bytes into the cache on the way
+        chunks = stream_csv_export(_iter_families(query), layout)
+        if cache:
+            chunks = cache.tee(key, chunks)
+        
+        response = Response(
+            stream_with_context(chunks),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+            headers={'Content-Disposition': f'attachment; filename={export_filename("csv")}'}
         )
+        response.set_etag(key)
+        response.last_modified = last_modified
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+# ==================== IMPORT ROUTE ====================
+
+# Maximum number of per-family errors echoed back by /api/import
+IMPORT_MAX_ERRORS = 100
+
+
+@bp.route('/import', methods=['POST'])
+def import_guests():
+    """
+    Import families from an uploaded CSV or XLSX file (multipart field 'file')
+    Accepts the tabular, structured and block layouts produced by the exports
+    The upload is parsed incrementally and loaded in batches of IMPORT_BATCH_SIZE
+    families, one transaction per batch; ?dry_run=1 validates without writing
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'No file uploaded'}), 400
+    
+    file_format = request.args.get('format') or upload.filename.rsplit('.', 1)[-1].lower()
+    if file_format not in IMPORT_FORMATS:
+        return jsonify({'error': f'Format must be one of: {", ".join(IMPORT_FORMATS)}'}), 400
+    
+    dry_run = _flag('dry_run')
+    batch_size = current_app.config['IMPORT_BATCH_SIZE']
+    
+    summary = {
+        'dry_run': dry_run,
+        'layout': None,
+        'families': 0,
+        'guests': 0,
+        'failed': 0,
+        'errors': []
+    }
+    batch = []
+    
+    def load(entries):
+        if dry_run or not entries:
+            return
+        family_ids, person_rows = insert_families(entries)
+        db.session.commit()
+        publish_inserted_families(entries, family_ids, person_rows)
+    
+    try:
+        rows = iter_csv_rows(upload.stream) if file_format == 'csv' else iter_xlsx_rows(upload.stream)
+        summary['layout'], families = parse_rows(rows)
+        
+        for number, item in enumerate(families, 1):
+            entry, error = parse_family_entry(item)
+            if error:
+                summary['failed'] += 1
+                if len(summary['errors']) < IMPORT_MAX_ERRORS:
+                    summary['errors'].append({'family': number, 'error': error})
+                continue
+            
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                load(batch)
+                summary['families'] += len(batch)
+                summary['guests'] += sum(len(members) for _, _, members in batch)
+                batch = []
+        
+        load(batch)
+        summary['families'] += len(batch)
+        summary['guests'] += sum(len(members) for _, _, members in batch)
+        
+        return jsonify(summary), 200 if dry_run else 201
+        
+    except (ValueError, BadZipFile) as e:
+        db.session.rollback()
+        return jsonify({'error': f'Could not read upload: {e}', **summary}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), **summary}), 500
+
+
 # ==================== STATS ROUTE ====================
 
 @bp.route('/stats', methods=['GET'])
+@cached(lambda: ['stats'])
+@read_replica
 def get_stats():
-    """Get dashboard statistics"""
+    """Get dashboard statistics (a single-row read from the counters table)"""
     try:
-        total_families = Family.query.count()
-        total_guests = Person.query.count()
-        
-        return jsonify({
+        etag, last_modified = _data_validators('stats')
+        if _is_not_modified(etag, last_modified):
+            return _not_modified(etag, last_modified)
+        
+        counts = Counters.current()
+        if counts:
+            total_families, total_guests = counts
+        else:
+            total_families = Family.query.count()
+            total_guests = Person.query.count()
+        
+        response = jsonify({
             'total_families': total_families,
             'total_guests': total_guests
-        }), 200
+        })
+        return _with_validators(response, etag, last_modified), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/stats/summary', methods=['GET'])
+@cached(lambda: ['families'])
+def get_stats_summary():
+    """
+    Get family-size summary (totals, average, largest/smallest, size histogram)
+    One GROUP BY over the maintained families.member_count column, no ORM objects
+    """
+    try:
+        size_rows = db.session.execute(
+            db.select(
+                Family.member_count,
+                db.func.count(Family.id),
+                db.func.min(Family.family_name)
+            ).group_by(Family.member_count)
+        ).all()
+        
+        return jsonify(summarize_family_sizes(size_rows)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -249,38 +748,204 @@ def get_stats():
 # ==================== SEARCH ROUTE ====================
 
 @bp.route('/search', methods=['GET'])
+@cached(lambda: ['families'])
+@read_replica
 def search():
-    """Search families by name, member name, or address"""
+    """
+    Search families by name, member name, or address
+    Paginated like /families; pass ?all=1 for the full list sorted by family name,
+    or ?order=relevance for the top ?limit= matches ranked by the search backend
+    Accepts ?fields= and ?include=members like /families
+    """
     try:
+        projection = FamilyProjection.from_request(request.args)
         query = request.args.get('q', '').strip()
         
-        if not query:
-            return jsonify([]), 200
+        # Single query returning (family_id, rank) for every matching family
+        backend = current_app.config['SEARCH_BACKEND']
+        matches = family_matches(query, backend) if query else None
         
-        # Search in family names and addresses
-        families = Family.query.filter(
-            db.or_(
-                Family.family_name.ilike(f'%{query}%'),
-                Family.address.ilike(f'%{query}%')
-            )
-        ).all()
+        if matches is None:
+            if _flag('all'):
+                return jsonify([]), 200
+            return jsonify({'families': [], 'next_cursor': None}), 200
         
-        # Search in person names
-        persons = Person.query.filter(Person.name.ilike(f'%{query}%')).all()
+        for statement, params in search_settings(backend):
+            db.session.execute(statement, params)
         
-        # Get unique families from person search
-        person_families = {person.family for person in persons}
+        matches = matches.subquery()
         
-        # Combine and remove duplicates
-        all_families = set(families) | person_families
+        # One query for the matching families, one for all their members
+        families_query = projection.select() \
+            .join(matches, matches.c.family_id == Family.id)
         
-        # Convert to dict and sort
-        result = sorted(
-            [family.to_dict() for family in all_families],
-            key=lambda x: x['family_name']
-        )
+        if _flag('all'):
+            rows = db.session.execute(families_query.order_by(Family.family_name)).all()
+            return jsonify(projection.serialize(rows)), 200
+        
+        if request.args.get('order') == 'relevance':
+            rows = db.session.execute(
+                families_query.order_by(matches.c.rank.desc(), Family.family_name)
+                .limit(_page_limit())
+            ).all()
+            return jsonify({
+                'families': projection.serialize(rows),
+                'next_cursor': None
+            }), 200
         
-        return jsonify(result), 200
+        rows, next_cursor = _paginate_families(families_query)
+        return jsonify({
+            'families': projection.serialize(rows),
+            'next_cursor': next_cursor
+        }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/search/typeahead', methods=['GET'])
+def search_typeahead():
+    """
+    Resolve a type-ahead query to ranked family ids from the in-memory index
+    Never touches the database; needs SEARCH_INDEX_ENABLED
+    """
+    try:
+        index = current_app.extensions.get('search_index')
+        if index is None or not index.ready:
+            return jsonify({'error': 'Search index is not enabled'}), 503
+        
+        query = request.args.get('q', '').strip()
+        results = index.search(query, limit=_page_limit()) if query else []
+        
+        return jsonify({'family_ids': [family_id for family_id, _ in results]}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/search/index', methods=['GET'])
+def search_index_stats():
+    """Report size and memory use of the in-memory search index"""
+    index = current_app.extensions.get('search_index')
+    if index is None:
+        return jsonify({'error': 'Search index is not enabled'}), 503
+    return jsonify(index.stats()), 200
+
+
+# ==================== SYNC ROUTE ====================
+
+@bp.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    Delta sync: families and persons written since ?since=<token>, plus the ids of
+    rows deleted since then. Omit since for a full snapshot. Clients should apply
+    the upserts before the deletions and keep the returned token for the next call
+    Returns: {token, families, persons, deleted: {families, persons}}
+    410 when the token is older than the retained tombstones (resync without since)
+    """
+    try:
+        version, sync_floor = DataVersion.sync_state()
+        
+        since, error, status = parse_sync_token(request.args.get('since'), version, sync_floor)
+        if error:
+            return jsonify({'error': error}), status
+        
+        queries = ChangeQueries(since)
+        tombstones = db.session.execute(queries.tombstones) if queries.tombstones is not None else ()
+        
+        return jsonify({
+            'token': str(version),
+            'families': queries.projection.serialize(db.session.execute(queries.families).all()),
+            'persons': serialize_person_rows(db.session.execute(queries.persons)),
+            'deleted': group_tombstones(tombstones)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ==================== EVENTS ROUTE ====================
+
+@bp.route('/events', methods=['GET'])
+def change_events():
+    """
+    Server-Sent Events stream of committed family/person changes
+    Sends 'ready' with the current /api/changes token, then one 'change' event per
+    commit ([{type, id, op, updated_at, ...}]); 'resync' means the client fell behind
+    and should catch up through /api/changes. Idle streams get a comment heartbeat
+    Each stream holds a request thread, so only EVENTS_MAX_THREAD_CLIENTS are
+    accepted per process; asgi.py serves the same stream without that limit
+    """
+    feed = current_app.extensions.get('change_feed')
+    if feed is None:
+        return jsonify({'error': 'Change feed is not enabled'}), 503
+    
+    subscription = feed.subscribe(limit=thread_client_limit(current_app.config))
+    if subscription is None:
+        return jsonify({'error': 'Too many event stream clients'}), 503
+    
+    version, _ = DataVersion.sync_state()
+    heartbeat = current_app.config['EVENTS_HEARTBEAT']
+    
+    def generate():
+        yield f'retry: 5000\nevent: ready\ndata: {{"token":"{version}"}}\n\n'
+        while True:
+            message = subscription.get(timeout=heartbeat)
+            if message is None:
+                yield ': keepalive\n\n'
+            elif message is RESYNC:
+                yield 'event: resync\ndata: {}\n\n'
+            else:
+                yield message
+    
+    # No stream_with_context: the stream holds no app context or DB connection
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.call_on_close(lambda: feed.broker.unsubscribe(subscription))
+    return response
+
+
+@bp.route('/events/stats', methods=['GET'])
+def change_events_stats():
+    """Report connected event stream clients and published messages in this process"""
+    feed = current_app.extensions.get('change_feed')
+    if feed is None:
+        return jsonify({'error': 'Change feed is not enabled'}), 503
+    return jsonify({'backend': type(feed.backend).__name__, **feed.broker.stats()}), 200
+
+
+# ==================== CACHE ROUTE ====================
+
+@bp.route('/cache/stats', methods=['GET'])
+def response_cache_stats():
+    """Report hit/miss counters of this process's response cache"""
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        return jsonify({'error': 'Response cache is not enabled'}), 503
+    return jsonify(cache.stats()), 200
+
+
+# ==================== DATABASE POOL ROUTE ====================
+
+@bp.route('/db/pool', methods=['GET'])
+def database_pool_stats():
+    """
+    Report this process's connection pools: size, checked-out and overflow connections,
+    checkout waits, and for read replicas their current lag
+    """
+    try:
+        status = pool_status(db.engine)
+        router = current_app.extensions.get('replica_router')
+        if router is not None:
+            lags = router.status()
+            status['replicas'] = {
+                key: {**pool_status(db.engines[key]), 'lag': lags['lag'].get(key)}
+                for key in router.replica_keys()
+            }
+            status['replica_max_lag'] = lags['max_lag']
+        return jsonify(status), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,155 @@
+import re
+from flask import current_app
+from sqlalchemy import select, union_all, literal, func, or_, text
+from app import db
+from app.models import Family, Person
+
+
+# Supported search backends (Config.SEARCH_BACKEND)
+SEARCH_BACKENDS = ('ilike', 'fulltext', 'trigram', 'memory')
+
+# Text search configuration - 'simple' does no stemming, which suits personal names
+TS_CONFIG = 'simple'
+
+
+def _group_by_family(*selects):
+    """
+    Combine (family_id, rank) selects into one row per family with its best rank
+    """
+    matches = union_all(*selects).subquery()
+    return select(
+        matches.c.family_id,
+        func.max(matches.c.rank).label('rank')
+    ).group_by(matches.c.family_id)
+
+
+def _ilike_matches(query):
+    """Substring match with ILIKE - no index support, every match ranks equally"""
+    pattern = f'%{query}%'
+    no_rank = literal(0.0, db.Float).label('rank')
+
+    return _group_by_family(
+        select(Family.id.label('family_id'), no_rank).where(
+            or_(Family.family_name.ilike(pattern), Family.address.ilike(pattern))
+        ),
+        select(Person.family_id.label('family_id'), no_rank).where(Person.name.ilike(pattern))
+    )
+
+
+def prefix_tsquery(query):
+    """
+    Turn free text into a prefix tsquery string for type-ahead, e.g. 'pra vel' -> 'pra:* & vel:*'
+    Returns: tsquery string, or None if the text has no searchable words
+    """
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _fulltext_matches(query):
+    """
+    PostgreSQL full-text match on the generated search_vector columns (GIN indexed)
+    Returns None when the query has no searchable words
+    """
+    tsquery_text = prefix_tsquery(query)
+    if tsquery_text is None:
+        return None
+
+    tsquery = func.to_tsquery(TS_CONFIG, tsquery_text)
+    family_vector = db.literal_column('families.search_vector')
+    person_vector = db.literal_column('persons.search_vector')
+
+    return _group_by_family(
+        select(
+            Family.id.label('family_id'),
+            func.ts_rank(family_vector, tsquery).label('rank')
+        ).where(family_vector.op('@@')(tsquery)),
+        select(
+            Person.family_id.label('family_id'),
+            func.ts_rank(person_vector, tsquery).label('rank')
+        ).where(person_vector.op('@@')(tsquery))
+    )
+
+
+def _trigram_matches(query):
+    """
+    pg_trgm fuzzy/substring match, ranked by word similarity (GIN trigram indexed)
+    Catches typos ("Velachry", "Prabu") as well as plain substrings; the
+    threshold and result limit come from SEARCH_TRGM_THRESHOLD / SEARCH_RESULT_LIMIT
+    (run search_settings() first so <% uses the configured threshold)
+    """
+    pattern = f'%{query}%'
+    term = literal(query)
+    
+    def fuzzy(column):
+        return or_(term.op('<%')(column), column.ilike(pattern))
+    
+    matches = _group_by_family(
+        select(
+            Family.id.label('family_id'),
+            func.greatest(
+                func.word_similarity(term, Family.family_name),
+                func.word_similarity(term, Family.address)
+            ).label('rank')
+        ).where(or_(fuzzy(Family.family_name), fuzzy(Family.address))),
+        select(
+            Person.family_id.label('family_id'),
+            func.word_similarity(term, Person.name).label('rank')
+        ).where(fuzzy(Person.name))
+    )
+    
+    return matches.order_by(db.desc('rank')).limit(current_app.config['SEARCH_RESULT_LIMIT'])
+
+
+def _memory_matches(query):
+    """
+    Resolve matches from the in-process n-gram index (SEARCH_INDEX_ENABLED) without
+    a database round trip; falls back to ILIKE while the index is not available
+    """
+    index = current_app.extensions.get('search_index')
+    if index is None or not index.ready:
+        return _ilike_matches(query)
+    
+    results = index.search(query, limit=current_app.config['SEARCH_RESULT_LIMIT'])
+    if not results:
+        return None
+    
+    ranks = dict(results)
+    return select(
+        Family.id.label('family_id'),
+        db.case(ranks, value=Family.id, else_=0.0).label('rank')
+    ).where(Family.id.in_(ranks))
+
+
+_BACKENDS = {
+    'ilike': _ilike_matches,
+    'fulltext': _fulltext_matches,
+    'trigram': _trigram_matches,
+    'memory': _memory_matches,
+}
+
+
+def search_settings(backend):
+    """
+    Statements to execute in the transaction before running family_matches()
+    Returns: list of (statement, params)
+    """
+    if backend != 'trigram':
+        return []
+    # The <% operator uses this session-level threshold and can be answered
+    # from the trigram index; set_config(..., true) scopes it to this transaction
+    return [(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {'threshold': str(current_app.config['SEARCH_TRGM_THRESHOLD'])}
+    )]
+
+
+def family_matches(query, backend):
+    """
+    Build a single query returning (family_id, rank) for every family matching the text
+    Returns: SQLAlchemy select, or None if nothing can match
+    """
+    if backend not in _BACKENDS:
+        raise RuntimeError(f'Unknown search backend: {backend}')
+    return _BACKENDS[backend](query)
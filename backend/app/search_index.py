@@ -0,0 +1,258 @@
+import re
+import sys
+import threading
+from array import array
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from app import db
+from app.models import Family, Person
+
+
+# Length of the n-grams kept in the inverted index
+GRAM_SIZE = 3
+
+# Anything that is not a letter or digit separates words
+_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    """
+    Lower-case text and collapse punctuation into single spaces, with a leading space
+    so every word, the first included, follows a space (for word-start ranking)
+    """
+    return ' ' + _SEPARATORS.sub(' ', (text or '').casefold()).strip()
+
+
+def _grams(text):
+    """Return the set of n-grams in an already normalized text"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class NgramIndex:
+    """
+    In-memory inverted trigram index over family names, addresses and member names
+    Each indexed field is a document:
+      family docs use id * 2 (family_name + address), person docs use id * 2 + 1
+    Postings are compact array('q') lists of document ids, so memory stays a few
+    bytes per (gram, document) pair rather than a Python int/set entry. Removed
+    documents leave their postings behind until a gram's list is mostly garbage
+    and gets compacted, so writes never scan long posting lists under the lock
+    The index only sees writes committed through this process's sessions
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}      # gram -> array('q') of doc ids
+        self._texts = {}         # doc id -> normalized text (for removal and verification)
+        self._doc_family = {}    # person doc id -> family id
+        self._family_docs = {}   # family id -> set of its person doc ids
+        self._garbage = {}       # gram -> postings left by removed documents
+        self.ready = False
+
+    # ----- maintenance -----
+
+    def load(self, session):
+        """(Re)build the whole index from the database"""
+        with self._lock:
+            self._postings.clear()
+            self._texts.clear()
+            self._doc_family.clear()
+            self._family_docs.clear()
+            self._garbage.clear()
+
+            families = session.execute(select(Family.id, Family.family_name, Family.address))
+            for family_id, family_name, address in families:
+                self.put_family(family_id, family_name, address)
+
+            persons = session.execute(select(Person.id, Person.family_id, Person.name))
+            for person_id, family_id, name in persons:
+                self.put_person(person_id, family_id, name)
+
+            self.ready = True
+
+    def _add(self, doc_id, text):
+        self._texts[doc_id] = text
+        for gram in _grams(text):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array('q')
+            postings.append(doc_id)
+
+    def _remove(self, doc_id):
+        text = self._texts.pop(doc_id, None)
+        if text is None:
+            return
+        for gram in _grams(text):
+            garbage = self._garbage.get(gram, 0) + 1
+            if garbage * 2 > len(self._postings[gram]):
+                self._compact(gram)
+            else:
+                self._garbage[gram] = garbage
+
+    def _compact(self, gram):
+        """Rewrite a gram's postings with one entry per live document that contains it"""
+        live = dict.fromkeys(doc_id for doc_id in self._postings[gram]
+                             if gram in self._texts.get(doc_id, ''))
+        if live:
+            self._postings[gram] = array('q', live)
+        else:
+            del self._postings[gram]
+        self._garbage.pop(gram, None)
+
+    def _remove_person_doc(self, doc_id):
+        self._remove(doc_id)
+        family_id = self._doc_family.pop(doc_id, None)
+        docs = self._family_docs.get(family_id)
+        if docs is not None:
+            docs.discard(doc_id)
+            if not docs:
+                del self._family_docs[family_id]
+
+    def put_family(self, family_id, family_name, address):
+        """Insert or replace a family's own document"""
+        with self._lock:
+            doc_id = family_id * 2
+            self._remove(doc_id)
+            self._add(doc_id, normalize(f'{family_name} {address}'))
+
+    def put_person(self, person_id, family_id, name):
+        """Insert or replace a person's document"""
+        with self._lock:
+            doc_id = person_id * 2 + 1
+            self._remove_person_doc(doc_id)
+            self._doc_family[doc_id] = family_id
+            self._family_docs.setdefault(family_id, set()).add(doc_id)
+            self._add(doc_id, normalize(name))
+
+    def delete_family(self, family_id):
+        """Remove a family and any of its member documents still in the index"""
+        with self._lock:
+            self._remove(family_id * 2)
+            for doc_id in self._family_docs.pop(family_id, ()):
+                self._remove(doc_id)
+                self._doc_family.pop(doc_id, None)
+
+    def delete_person(self, person_id):
+        """Remove a person's document"""
+        with self._lock:
+            self._remove_person_doc(person_id * 2 + 1)
+
+    # ----- queries -----
+
+    def search(self, query, limit=None):
+        """
+        Find families whose name, address or member names contain the query text
+        Queries shorter than GRAM_SIZE have no gram to look up and scan every document
+        Returns: list of (family_id, rank) sorted by rank, best first
+        """
+        needle = normalize(query).strip()
+        if not needle:
+            return []
+
+        with self._lock:
+            if len(needle) < GRAM_SIZE:
+                candidates = list(self._texts)
+            else:
+                grams = sorted(_grams(needle), key=lambda gram: len(self._postings.get(gram, ())))
+                if grams[0] not in self._postings:
+                    return []
+
+                candidates = set(self._postings[grams[0]])
+                for gram in grams[1:]:
+                    candidates.intersection_update(self._postings.get(gram, ()))
+                    if not candidates:
+                        return []
+
+            ranks = {}
+            for doc_id in candidates:
+                # Removed documents have no text; stale postings never match
+                doc_text = self._texts.get(doc_id, '')
+                position = doc_text.find(needle)
+                if position < 0:
+                    continue
+                # Matches at the start of a word rank above matches inside a word
+                rank = 1.0 if doc_text[position - 1] == ' ' else 0.5
+                family_id = doc_id // 2 if doc_id % 2 == 0 else self._doc_family[doc_id]
+                ranks[family_id] = max(rank, ranks.get(family_id, 0.0))
+
+        results = sorted(ranks.items(), key=lambda item: (-item[1], item[0]))
+        return results[:limit] if limit else results
+
+    def stats(self):
+        """Return document/gram counts and an estimate of the index's memory use in bytes"""
+        with self._lock:
+            memory = sys.getsizeof(self._postings) + sys.getsizeof(self._texts) \
+                + sys.getsizeof(self._doc_family) + sys.getsizeof(self._family_docs)
+            memory += sum(sys.getsizeof(docs) for docs in self._family_docs.values())
+            memory += sum(sys.getsizeof(gram) + sys.getsizeof(postings)
+                          for gram, postings in self._postings.items())
+            memory += sum(sys.getsizeof(text) for text in self._texts.values())
+            return {
+                'ready': self.ready,
+                'documents': len(self._texts),
+                'grams': len(self._postings),
+                'postings': sum(len(postings) for postings in self._postings.values())
+                - sum(self._garbage.values()),
+                'memory_bytes': memory
+            }
+
+
+# ==================== SESSION EVENTS ====================
+# Changes are snapshotted at flush time and applied only once the transaction commits
+
+_PENDING_KEY = 'search_index_pending'
+
+
+def _current_index():
+    if not has_app_context():
+        return None
+    index = current_app.extensions.get('search_index')
+    return index if index is not None and index.ready else None
+
+
+def index_committed_rows(families=(), persons=()):
+    """
+    Add rows written outside the ORM unit of work (bulk inserts) after they commit
+    families: (id, family_name, address) tuples; persons: (id, family_id, name) tuples
+    """
+    index = _current_index()
+    if index is None:
+        return
+    for family_id, family_name, address in families:
+        index.put_family(family_id, family_name, address)
+    for person_id, family_id, name in persons:
+        index.put_person(person_id, family_id, name)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changes(session, flush_context):
+    if _current_index() is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, [])
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Family):
+            pending.append(('put_family', obj.id, obj.family_name, obj.address))
+        elif isinstance(obj, Person):
+            pending.append(('put_person', obj.id, obj.family_id, obj.name))
+
+    for obj in session.deleted:
+        if isinstance(obj, Family):
+            pending.append(('delete_family', obj.id))
+        elif isinstance(obj, Person):
+            pending.append(('delete_person', obj.id))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    index = _current_index()
+    if not pending or index is None:
+        return
+    for method, *args in pending:
+        getattr(index, method)(*args)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
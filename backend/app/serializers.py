@@ -0,0 +1,190 @@
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from app import db
+from app.models import Family, Person
+from app.instrumentation import timed_serialization
+from app.utils import encode_cursor, decode_cursor
+
+
+# Columns read for the row serializers, in the key order of Family/Person.to_dict()
+FAMILY_COLUMNS = {
+    'id': Family.id,
+    'family_name': Family.family_name,
+    'address': Family.address,
+    'member_count': Family.member_count,
+    'created_at': Family.created_at,
+    'updated_at': Family.updated_at,
+}
+
+PERSON_COLUMNS = {
+    'id': Person.id,
+    'family_id': Person.family_id,
+    'name': Person.name,
+    'created_at': Person.created_at,
+    'updated_at': Person.updated_at,
+}
+
+FAMILY_KEYS = ('id', 'family_name', 'address', 'members', 'member_count', 'created_at', 'updated_at')
+PERSON_KEYS = tuple(PERSON_COLUMNS)
+
+# Values for ?include=
+FAMILY_INCLUDES = ('members',)
+
+# Family ids per member query (the same chunking selectinload uses)
+MEMBER_CHUNK_SIZE = 500
+
+
+@lru_cache(maxsize=None)
+def compile_row_serializer(keys, computed=(), offset=0):
+    """
+    Build a function turning a result row into a JSON-ready dict
+    keys: output keys in order; keys not in computed are read from the row positionally
+    (starting at offset), computed keys become extra positional arguments after the row
+    The key layout is resolved once per projection, so serializing a row is a tuple
+    slice and a dict(zip()) - no ORM objects, per-key lookups or isoformat() calls
+    """
+    # computed may name keys the layout leaves out (e.g. member_count with ?fields=members)
+    row_keys = [key for key in keys if key not in computed]
+    stop = offset + len(row_keys)
+    if not computed:
+        return lambda row: dict(zip(keys, row[offset:stop]))
+
+    # Positions of each key in row values followed by the computed arguments
+    order = [row_keys.index(key) if key not in computed else len(row_keys) + computed.index(key)
+             for key in keys]
+    pick = itemgetter(*order)
+
+    if len(order) == 1:
+        return lambda row, *values: {keys[0]: pick(row[offset:stop] + values)}
+    return lambda row, *values: dict(zip(keys, pick(row[offset:stop] + values)))
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class FamilyProjection:
+    """
+    Sparse fieldset for family responses (?fields= and ?include=members)
+    Only the requested columns are selected; members are queried only when included.
+    Without members, member_count comes from the maintained families.member_count
+    column; with members it is their number, as in Family.to_dict()
+    Every row starts with the hidden cursor_id/cursor_created_at columns used for
+    member lookups and keyset cursors
+    """
+
+    def __init__(self, fields=None, include=None):
+        requested = set(_split(fields)) if fields else set(FAMILY_KEYS)
+        includes = set(_split(include))
+
+        unknown = (requested - set(FAMILY_KEYS)) | (includes - set(FAMILY_INCLUDES))
+        if unknown:
+            raise ValueError(f'Unknown field(s): {", ".join(sorted(unknown))}')
+
+        self.include_members = 'members' in requested or 'members' in includes
+        self.keys = tuple(key for key in FAMILY_KEYS
+                          if key in requested or (key == 'members' and self.include_members))
+
+        computed = ('members', 'member_count') if self.include_members else ()
+        self._row_keys = tuple(key for key in self.keys if key not in computed)
+        self._serialize = compile_row_serializer(self.keys, computed, offset=2)
+
+    @classmethod
+    def from_request(cls, args):
+        """Build the projection from request query arguments"""
+        return cls(args.get('fields'), args.get('include'))
+
+    def columns(self):
+        """Columns to select, in row order"""
+        return [
+            Family.id.label('cursor_id'),
+            Family.created_at.label('cursor_created_at'),
+            *(FAMILY_COLUMNS[key] for key in self._row_keys)
+        ]
+
+    def select(self):
+        return db.select(*self.columns())
+
+    def serialize(self, rows, members=None):
+        """
+        Serialize rows selected with columns()
+        members: preloaded group_members() result; loaded here when needed and omitted
+        Returns: list of dicts, in row order
+        """
+        with timed_serialization():
+            if not self.include_members:
+                return [self._serialize(row) for row in rows]
+
+            if members is None:
+                members = _members_by_family([row.cursor_id for row in rows])
+            return [
+                self._serialize(row, members[row.cursor_id], len(members[row.cursor_id]))
+                for row in rows
+            ]
+
+
+def _chunks(values, size):
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def serialize_person_rows(rows):
+    """Serialize rows selected with PERSON_COLUMNS (shaped like Person.to_dict())"""
+    serialize = compile_row_serializer(PERSON_KEYS)
+    with timed_serialization():
+        return [serialize(row) for row in rows]
+
+
+def member_statements(family_ids):
+    """Member queries for the given families, one per chunk of ids"""
+    for chunk in _chunks(family_ids, MEMBER_CHUNK_SIZE):
+        yield db.select(*PERSON_COLUMNS.values()) \
+            .where(Person.family_id.in_(chunk)) \
+            .order_by(Person.family_id, Person.id)
+
+
+def group_members(family_ids, rows):
+    """
+    Serialize member rows from member_statements() by family
+    Returns: {family_id: [member dicts]} with an entry for every family id
+    """
+    serialize = compile_row_serializer(PERSON_KEYS)
+    members = {family_id: [] for family_id in family_ids}
+    for row in rows:
+        members[row[1]].append(serialize(row))
+    return members
+
+
+def _members_by_family(family_ids):
+    """Load serialized members for the given families on the Flask-SQLAlchemy session"""
+    return group_members(family_ids, (
+        row for statement in member_statements(family_ids)
+        for row in db.session.execute(statement)
+    ))
+
+
+# ==================== KEYSET PAGINATION ====================
+
+def page_statement(query, limit, cursor=None):
+    """
+    Apply keyset pagination on (created_at, id) to a FamilyProjection select,
+    fetching one extra row to know whether another page exists
+    Raises ValueError on a bad cursor
+    """
+    if cursor:
+        created_at, family_id = decode_cursor(cursor)
+        query = query.where(db.tuple_(Family.created_at, Family.id) < (created_at, family_id))
+    return query.order_by(Family.created_at.desc(), Family.id.desc()).limit(limit + 1)
+
+
+def split_page(rows, limit):
+    """
+    Trim the extra row fetched by page_statement()
+    Returns: (rows, next_cursor)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].cursor_created_at, rows[-1].cursor_id)
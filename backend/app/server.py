@@ -0,0 +1,71 @@
+from gunicorn.app.base import BaseApplication
+from app.db_pool import dispose_engines
+from app.events import thread_client_limit
+
+
+def server_options(app, host, port, workers=None, threads=None):
+    """Gunicorn settings from the SERVER_* Config values"""
+    config = app.config
+    return {
+        'bind': f'{host}:{port}',
+        'workers': workers or config['SERVER_WORKERS'],
+        'threads': threads or config['SERVER_THREADS'],
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'timeout': config['SERVER_TIMEOUT'],
+        'graceful_timeout': config['SERVER_GRACEFUL_TIMEOUT'],
+        'keepalive': config['SERVER_KEEPALIVE'],
+        'max_requests': config['SERVER_MAX_REQUESTS'],
+        'max_requests_jitter': config['SERVER_MAX_REQUESTS'] // 10,
+        'accesslog': '-' if config['SERVER_ACCESS_LOG'] else None,
+        'worker_exit': lambda server, worker: dispose_engines(app, close=True),
+    }
+
+
+class ProductionServer(BaseApplication):
+    """
+    Gunicorn master serving an already created Flask app from preforked, threaded workers
+    The app (and its search index) is built once in the master and shared copy-on-write;
+    each worker starts with an empty connection pool. SIGTERM/SIGINT stop accepting
+    connections and let in-flight requests finish within SERVER_GRACEFUL_TIMEOUT
+    """
+
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self):
+        return self.application
+
+
+def per_process_warnings(app, workers, threads):
+    """
+    Features limited by the worker model: /api/events streams tie up request threads,
+    and with several workers some features only see their own worker's writes
+    """
+    config = app.config
+    warnings = []
+    if config['EVENTS_BACKEND'] != 'none':
+        limit = thread_client_limit(config)
+        if limit >= threads:
+            warnings.append(f"EVENTS_MAX_THREAD_CLIENTS={limit}: /api/events streams can hold all "
+                            f"{threads} threads of a worker and block every other request")
+        else:
+            warnings.append(f"/api/events holds a request thread per client: at most {limit} streams "
+                            f"per worker (serve it from asgi.py for idle clients without threads)")
+    if workers <= 1:
+        return warnings
+    if config['EVENTS_BACKEND'] == 'local':
+        warnings.append("EVENTS_BACKEND='local': /api/events clients only see their worker's writes "
+                        "(use 'postgres')")
+    if config['RESPONSE_CACHE_BACKEND'] == 'memory':
+        warnings.append("RESPONSE_CACHE_BACKEND='memory': other workers' writes do not invalidate "
+                        "entries until RESPONSE_CACHE_TTL (use 'redis')")
+    if config['SEARCH_INDEX_ENABLED']:
+        warnings.append('SEARCH_INDEX_ENABLED: each worker\'s type-ahead index misses other workers\' writes')
+    return warnings
@@ -0,0 +1,54 @@
+from app import db
+from app.models import Family, Person, Tombstone
+from app.serializers import FamilyProjection, FAMILY_KEYS, PERSON_COLUMNS
+
+
+# Delta sync queries behind /api/changes, shared by the Flask view (app/routes.py)
+# and the async endpoint (app/asgi.py)
+
+# Families in /api/changes carry their member_count; members arrive as persons
+SYNC_FAMILY_FIELDS = ','.join(key for key in FAMILY_KEYS if key != 'members')
+
+
+def parse_sync_token(since, version, sync_floor):
+    """
+    Validate a ?since= sync token against the current (version, sync_floor)
+    Returns: (since, error, status) - since is None for a full snapshot, error is
+    None when the token is usable (status 400 for a bad token, 410 for an expired one)
+    """
+    if since is None:
+        return None, None, None
+    try:
+        since = int(since)
+    except ValueError:
+        return None, 'Invalid sync token', 400
+    if since > version:
+        return None, 'Invalid sync token', 400
+    if since < sync_floor:
+        return None, 'Sync token expired, resync without since', 410
+    return since, None, None
+
+
+class ChangeQueries:
+    """Statements for one /api/changes response: rows written, and deleted, after since"""
+
+    def __init__(self, since=None):
+        self.projection = FamilyProjection(SYNC_FAMILY_FIELDS)
+        self.families = self.projection.select().order_by(Family.id)
+        self.persons = db.select(*PERSON_COLUMNS.values()).order_by(Person.id)
+        self.tombstones = None
+
+        if since is not None:
+            self.families = self.families.where(Family.sync_version > since)
+            self.persons = self.persons.where(Person.sync_version > since)
+            self.tombstones = db.select(Tombstone.entity, Tombstone.entity_id) \
+                .where(Tombstone.version > since) \
+                .order_by(Tombstone.version, Tombstone.id)
+
+
+def group_tombstones(rows):
+    """(entity, entity_id) tombstone rows as {families: [ids], persons: [ids]}"""
+    deleted = {'families': [], 'persons': []}
+    for entity, entity_id in rows:
+        deleted['families' if entity == 'family' else 'persons'].append(entity_id)
+    return deleted
@@ -1,42 +1,85 @@
+import base64
+import csv
 from datetime import datetime
-from io import BytesIO
-import pandas as pd
+from io import BytesIO, StringIO
+from tempfile import SpooledTemporaryFile
+from openpyxl import Workbook
+
+
+# Supported CSV export layouts
+CSV_LAYOUTS = ('block', 'table')
+
+# Column headers for the tabular CSV layout (one row per person)
+CSV_TABLE_HEADER = ['Family ID', 'Family Name', 'Address', 'Person ID', 'Person Name']
+
+# Approximate size of each chunk yielded by the streaming CSV export
+CSV_CHUNK_SIZE = 64 * 1024
+
+# Column headers for the structured Excel sheet (one row per family)
+EXCEL_STRUCTURED_HEADER = ['Family', 'Address', 'Members', 'Count']
+
+# Excel exports stay in memory up to this size, then spill to a temp file on disk
+EXCEL_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def export_filename(extension):
+    """
+    Build the dated download filename used by all exports
+    Returns: filename string, e.g. wedding_guests_16_Oct_2026.csv
+    """
+    
+    return f'wedding_guests_{datetime.now().strftime("%d_%b_%Y")}.{extension}'
 
 
 def generate_excel_export(families):
     """
-    Generate Excel file with grouped family format
-    Returns: (BytesIO object, filename)
+    Generate Excel file with a formatted 'Guest List' sheet and a 'Structured' sheet
+    Uses openpyxl's write-only workbook, so rows are written as families are consumed
+    families can be any iterable (e.g. a server-side cursor), it is consumed once
+    Returns: (SpooledTemporaryFile object, filename)
     """
     
-    # Create formatted data
-    output = []
-    output.append(['WEDDING GUEST LIST'])
-    output.append([''])  # Empty row
-    output.append([''])  # Empty row
+    workbook = Workbook(write_only=True)
     
-    total_guests = 0
-    total_families = len(families)
+    guest_sheet = workbook.create_sheet('Guest List')
+    guest_sheet.column_dimensions['A'].width = 80
     
-    for family in families:
-        # Get all members for this family
-        members = family.members
-        member_names = ', '.join([person.name for person in members])
-        member_count = len(members)
-        total_guests += member_count
-        
-        # Add family block
-        output.append([f'Family: {family.family_name}'])
-        output.append([f'Address: {family.address}'])
-        output.append([f'Members: {member_names}'])
-        output.append([f'Total: {member_count}'])
-        output.append([''])  # Empty row separator
-        output.append(['─' * 70])  # Separator line
-        output.append([''])  # Empty row
-    
-    # Add grand total
-    output.append([''])
-    output.append([f'GRAND TOTAL: {total_guests} Guests from {total_families} Families'])
+    structured_sheet = workbook.create_sheet('Structured')
+    structured_sheet.column_dimensions['A'].width = 30
+    structured_sheet.column_dimensions['B'].width = 60
+    structured_sheet.column_dimensions['C'].width = 80
+    structured_sheet.append(EXCEL_STRUCTURED_HEADER)
+    
+    def write_structured(families):
+        # Fill the structured sheet as each family passes through to the block rows
+        for family in families:
+            member_names = ', '.join(person.name for person in family.members)
+            structured_sheet.append(
+                [family.family_name, family.address, member_names, len(family.members)]
+            )
+            yield family
+    
+    for row in _block_rows(write_structured(families)):
+        guest_sheet.append(row)
+    
+    excel_file = SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_SIZE)
+    workbook.save(excel_file)
+    excel_file.seek(0)
+    
+    return excel_file, export_filename('xlsx')
+
+
+def generate_excel_export_pandas(families):
+    """
+    Generate Excel file with grouped family format through a pandas DataFrame
+    Kept as a fallback engine (EXCEL_EXPORT_ENGINE = 'pandas')
+    Returns: (BytesIO object, filename)
+    """
+    
+    import pandas as pd
+    
+    # Create formatted data
+    output = list(_block_rows(families))
     
     # Create DataFrame
     df = pd.DataFrame(output)
@@ -47,66 +90,96 @@ def generate_excel_export(families):
     with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, header=False, sheet_name='Guest List')
         
-        # Get the workbook and worksheet
-        workbook = writer.book
-        worksheet = writer.sheets['Guest List']
-        
         # Auto-adjust column width
+        worksheet = writer.sheets['Guest List']
         worksheet.column_dimensions['A'].width = 80
     
     excel_file.seek(0)
     
-    # Generate filename with current date
-    filename = f'wedding_guests_{datetime.now().strftime("%d_%b_%Y")}.xlsx'
-    
-    return excel_file, filename
+    return excel_file, export_filename('xlsx')
 
 
-def generate_csv_export(families):
+def _block_rows(families):
     """
-    Generate CSV file with grouped family format
-    Returns: (BytesIO object, filename)
+    Yield rows for the human-readable grouped family layout (CSV and Excel)
     """
     
-    # Create formatted data as text
-    output = []
-    output.append('WEDDING GUEST LIST\n')
-    output.append('\n')
+    yield ['WEDDING GUEST LIST']
+    yield []
     
     total_guests = 0
-    total_families = len(families)
+    total_families = 0
     
     for family in families:
-        # Get all members for this family
         members = family.members
-        member_names = ', '.join([person.name for person in members])
+        member_names = ', '.join(person.name for person in members)
         member_count = len(members)
         total_guests += member_count
+        total_families += 1
         
-        # Add family block
-        output.append(f'Family: {family.family_name}\n')
-        output.append(f'Address: {family.address}\n')
-        output.append(f'Members: {member_names}\n')
-        output.append(f'Total: {member_count}\n')
-        output.append('\n')
-        output.append('─' * 70 + '\n')
-        output.append('\n')
-    
-    # Add grand total
-    output.append('\n')
-    output.append(f'GRAND TOTAL: {total_guests} Guests from {total_families} Families\n')
-    
-    # Convert to string
-    csv_content = ''.join(output)
-    
-    # Create CSV file in memory
-    csv_file = BytesIO(csv_content.encode('utf-8'))
-    csv_file.seek(0)
+        # Family block
+        yield [f'Family: {family.family_name}']
+        yield [f'Address: {family.address}']
+        yield [f'Members: {member_names}']
+        yield [f'Total: {member_count}']
+        yield []
+        yield ['─' * 70]
+        yield []
+    
+    # Grand total
+    yield []
+    yield [f'GRAND TOTAL: {total_guests} Guests from {total_families} Families']
+
+
+def _csv_table_rows(families):
+    """
+    Yield CSV rows for the tabular layout: one row per person with family columns
+    Families without members still get one row with empty person columns
+    """
     
-    # Generate filename with current date
-    filename = f'wedding_guests_{datetime.now().strftime("%d_%b_%Y")}.csv'
+    yield CSV_TABLE_HEADER
     
-    return csv_file, filename
+    for family in families:
+        if not family.members:
+            yield [family.id, family.family_name, family.address, '', '']
+        for person in family.members:
+            yield [family.id, family.family_name, family.address, person.id, person.name]
+
+
+def stream_csv_export(families, layout='block'):
+    """
+    Stream a CSV export of the given families as UTF-8 encoded chunks
+    families can be any iterable (e.g. a server-side cursor), it is consumed once
+    Yields: bytes chunks of roughly CSV_CHUNK_SIZE
+    """
+    
+    rows = _csv_table_rows(families) if layout == 'table' else _block_rows(families)
+    
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    
+    yield buffer.getvalue().encode('utf-8')
+
+
+def generate_csv_export(families, layout='block'):
+    """
+    Generate CSV file with grouped family (or tabular) format
+    Returns: (BytesIO object, filename)
+    """
+    
+    csv_file = BytesIO()
+    for chunk in stream_csv_export(families, layout):
+        csv_file.write(chunk)
+    csv_file.seek(0)
+    
+    return csv_file, export_filename('csv')
 
 
 def format_family_for_display(family):
@@ -130,6 +203,30 @@ def format_family_for_display(family):
     }
 
 
+def encode_cursor(created_at, family_id):
+    """
+    Encode a (created_at, id) keyset position as an opaque cursor string
+    Returns: URL-safe cursor string
+    """
+    
+    raw = f'{created_at.isoformat()}|{family_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+    Returns: (created_at, family_id) - raises ValueError if the cursor is malformed
+    """
+    
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, family_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), int(family_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
 def validate_family_data(data):
     """
     Validate family input data
@@ -151,9 +248,10 @@ def validate_family_data(data):
     return True, None
 
 
-def validate_person_data(data):
+def validate_person_data(data, require_family_id=True):
     """
     Validate person input data
+    require_family_id=False skips the family check for members nested under a new family
     Returns: (is_valid, error_message)
     """
     
@@ -163,12 +261,15 @@ def validate_person_data(data):
     if not data.get('name') or not data['name'].strip():
         return False, 'Name is required and cannot be empty'
     
-    if not data.get('family_id'):
-        return False, 'Family ID is required'
-    
     if len(data['name'].strip()) > 200:
         return False, 'Name is too long (maximum 200 characters)'
     
+    if not require_family_id:
+        return True, None
+    
+    if not data.get('family_id'):
+        return False, 'Family ID is required'
+    
     try:
         family_id = int(data['family_id'])
         if family_id <= 0:
@@ -207,3 +308,37 @@ def get_family_summary(families):
         'largest_family': {'name': largest[0], 'size': largest[1]} if largest else None,
         'smallest_family': {'name': smallest[0], 'size': smallest[1]} if smallest else None
     }
+
+
+def summarize_family_sizes(size_rows):
+    """
+    Build the get_family_summary figures plus a size histogram from pre-aggregated rows
+    size_rows: iterable of (size, family_count, sample_family_name), one per family size
+    Returns: Dictionary with summary data
+    """
+    
+    rows = sorted(size_rows, key=lambda row: row[0])
+    
+    total_families = sum(count for _, count, _ in rows)
+    total_guests = sum(size * count for size, count, _ in rows)
+    
+    if not rows:
+        return {
+            'total_families': 0,
+            'total_guests': 0,
+            'average_family_size': 0,
+            'largest_family': None,
+            'smallest_family': None,
+            'size_histogram': []
+        }
+    
+    smallest, largest = rows[0], rows[-1]
+    
+    return {
+        'total_families': total_families,
+        'total_guests': total_guests,
+        'average_family_size': round(total_guests / total_families, 1),
+        'largest_family': {'name': largest[2], 'size': largest[0]},
+        'smallest_family': {'name': smallest[2], 'size': smallest[0]},
+        'size_histogram': [{'size': size, 'families': count} for size, count, _ in rows]
+    }
\ No newline at end of file
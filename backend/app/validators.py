@@ -0,0 +1,42 @@
+from datetime import timezone
+from werkzeug.http import http_date, parse_date, parse_etags, quote_etag
+
+
+# Conditional GET helpers shared by the Flask views (app/routes.py) and the async
+# read endpoints (app/asgi.py), so both serving modes answer revalidations alike
+
+
+def data_validators(prefix, version, updated_at):
+    """
+    ETag/Last-Modified for responses that change whenever any family/person changes
+    version, updated_at: the global data version (DataVersion.current())
+    Returns: (etag, last_modified)
+    """
+    return f'{prefix}-v{version}', updated_at
+
+
+def family_validators(family_id, updated_at):
+    """ETag/Last-Modified for a single family (updated_at also moves on member writes)"""
+    stamp = updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else '0'
+    return f'family-{family_id}-{stamp}', updated_at
+
+
+def is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+    """
+    Check the raw If-None-Match (preferred, weak comparison) or If-Modified-Since
+    header values against the validators; last_modified may be naive UTC or aware
+    """
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+    since = parse_date(if_modified_since) if if_modified_since else None
+    if since and last_modified:
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag, last_modified):
+    """ETag/Last-Modified headers, asking clients to revalidate before reusing the body"""
+    headers = {'ETag': quote_etag(etag), 'Cache-Control': 'no-cache'}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified.replace(tzinfo=timezone.utc))
+    return headers
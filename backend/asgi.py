@@ -0,0 +1,5 @@
+from app.asgi import create_asgi_app
+
+# ASGI application instance: async read routes, everything else served by the Flask app
+# Usage: uvicorn asgi:app --host 0.0.0.0 --port 5000
+app = create_asgi_app()
@@ -0,0 +1,114 @@
+"""
+Load-test the read API of a running server, to compare the WSGI and ASGI serving modes
+
+Usage:
+    flask run --port 5000 --with-threads          (WSGI)
+    uvicorn asgi:app --port 5001                  (ASGI)
+    python benchmark.py http://localhost:5000 --concurrency 200 --requests 5000
+    python benchmark.py http://localhost:5001 --concurrency 200 --requests 5000 --sse 1000
+
+Needs httpx (pip install httpx). --sse holds that many /api/events streams open
+while the request load runs, to measure how idle clients affect throughput
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+import httpx
+
+
+DEFAULT_PATHS = ['/api/families', '/api/families/1', '/api/stats', '/api/search?q=a']
+
+
+async def hold_event_streams(url, count):
+    """Open count /api/events streams and read them until the process is terminated"""
+    async def hold(client):
+        try:
+            async with client.stream('GET', f'{url}/api/events') as response:
+                async for _ in response.aiter_bytes():
+                    pass
+        except httpx.HTTPError:
+            return
+
+    limits = httpx.Limits(max_connections=count, max_keepalive_connections=count)
+    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+        await asyncio.gather(*(hold(client) for _ in range(count)))
+
+
+def _run_event_streams(url, count):
+    asyncio.run(hold_event_streams(url, count))
+
+
+def event_stream_process(url, count):
+    """Hold the streams from a separate process, so they do not slow down the load generator"""
+    process = multiprocessing.Process(target=_run_event_streams, args=(url, count), daemon=True)
+    process.start()
+    return process
+
+
+async def run_requests(client, url, paths, total, concurrency):
+    """Issue total GETs over paths from concurrency workers; returns (latencies, errors)"""
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            path = paths[index % len(paths)]
+            started = time.perf_counter()
+            try:
+                response = await client.get(f'{url}{path}')
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    paths = args.path or DEFAULT_PATHS
+
+    streams = None
+    if args.sse:
+        streams = event_stream_process(args.url, args.sse)
+        await asyncio.sleep(args.sse_warmup)
+
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+            connected = (await client.get(f'{args.url}/api/events/stats')).json().get('clients', 0) \
+                if args.sse else 0
+            started = time.perf_counter()
+            latencies, errors = await run_requests(client, args.url, paths, args.requests, args.concurrency)
+            elapsed = time.perf_counter() - started
+    finally:
+        if streams is not None:
+            streams.terminate()
+
+    latencies.sort()
+    print(f'{args.url}  concurrency={args.concurrency}  requests={args.requests}  '
+          f'sse={connected}/{args.sse}')
+    print(f'  throughput: {len(latencies) / elapsed:.1f} req/s  errors: {errors}')
+    if latencies:
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f'  latency ms: mean {statistics.mean(latencies) * 1000:.1f}  '
+              f'p50 {statistics.median(latencies) * 1000:.1f}  p95 {p95 * 1000:.1f}  '
+              f'max {latencies[-1] * 1000:.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the read API of a running server')
+    parser.add_argument('url', help='Server base URL, e.g. http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent request workers')
+    parser.add_argument('--requests', type=int, default=2000, help='Total requests to issue')
+    parser.add_argument('--sse', type=int, default=0, help='Idle /api/events streams to hold open')
+    parser.add_argument('--sse-warmup', type=float, default=2.0, help='Seconds to let streams connect')
+    parser.add_argument('--path', action='append', help='Path to request (repeatable)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    asyncio.run(main(parser.parse_args()))
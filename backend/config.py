@@ -24,15 +24,121 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI') or \
         f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     
+    # Connection pool (per process). Pre-ping replaces connections the server dropped,
+    # recycle (seconds) retires them before server/firewall idle timeouts
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    
+    # PostgreSQL statement_timeout in milliseconds (0 disables)
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))
+    
+    # Set when connecting through PgBouncer in transaction mode: the statement timeout
+    # is applied per transaction and the async engine disables prepared statement caches
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'False').lower() == 'true'
+    
+    # Read replicas (comma-separated URIs) for the read-only endpoints, registered as
+    # SQLALCHEMY_BINDS 'replica_1', 'replica_2', ... A replica whose data version trails
+    # the primary by more than DB_REPLICA_MAX_LAG seconds is skipped until it catches up
+    DB_REPLICA_URIS = [uri.strip() for uri in os.environ.get('DB_REPLICA_URIS', '').split(',') if uri.strip()]
+    SQLALCHEMY_BINDS = {f'replica_{number}': uri for number, uri in enumerate(DB_REPLICA_URIS, 1)}
+    DB_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', 5))
+    DB_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('DB_REPLICA_LAG_CHECK_INTERVAL', 1))
+    
+    # Extra engine arguments, merged over the pool settings above
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    
+    # Opt-in instrumentation: /api responses get a Server-Timing header (statement count,
+    # DB time, serialization time) and statements slower than SLOW_QUERY_THRESHOLD_MS are
+    # logged (as JSON, parameters redacted) to the 'app.instrumentation' logger
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'False').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    
     # Disable SQLAlchemy modification tracking (saves resources)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Echo SQL queries in console (useful for debugging)
     SQLALCHEMY_ECHO = False
     
-    # JSON Configuration
+    # JSON Configuration (app.json_provider.FastJSONProvider - orjson when installed)
+    # Responses are compact unless JSON_PRETTYPRINT is set
     JSON_SORT_KEYS = False
-    JSONIFY_PRETTYPRINT_REGULAR = True
+    JSON_PRETTYPRINT = os.environ.get('JSON_PRETTYPRINT', 'False').lower() == 'true'
+    
+    # Pagination Configuration (keyset pagination on /api/families and /api/search)
+    FAMILIES_PAGE_SIZE = int(os.environ.get('FAMILIES_PAGE_SIZE', 50))
+    FAMILIES_MAX_PAGE_SIZE = int(os.environ.get('FAMILIES_MAX_PAGE_SIZE', 500))
+    
+    # Rows fetched per server-side cursor batch when streaming (?stream=1, exports)
+    STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 500))
+    
+    # Excel export engine: 'openpyxl' (write-only, streamed) or 'pandas' (legacy)
+    EXCEL_EXPORT_ENGINE = os.environ.get('EXCEL_EXPORT_ENGINE', 'openpyxl')
+    
+    # Export artifact cache (on local disk, keyed by format + data version, LRU evicted)
+    EXPORT_CACHE_ENABLED = os.environ.get('EXPORT_CACHE_ENABLED', 'True').lower() == 'true'
+    EXPORT_CACHE_DIR = os.environ.get('EXPORT_CACHE_DIR')  # defaults to <instance>/export_cache
+    EXPORT_CACHE_MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    
+    # Search backend for /api/search: 'ilike' (substring scan), 'fulltext', 'trigram'
+    # or 'memory' ('fulltext' and 'trigram' need PostgreSQL and their migrations,
+    # 'memory' needs SEARCH_INDEX_ENABLED)
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'ilike')
+    
+    # Trigram backend: minimum word similarity (0-1) and maximum matching families
+    SEARCH_TRGM_THRESHOLD = float(os.environ.get('SEARCH_TRGM_THRESHOLD', 0.4))
+    SEARCH_RESULT_LIMIT = int(os.environ.get('SEARCH_RESULT_LIMIT', 200))
+    
+    # In-process n-gram index for type-ahead, built in create_app and kept current by
+    # session events. Each process only sees its own writes, so use it with a single
+    # worker process (threads are fine)
+    SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'False').lower() == 'true'
+    
+    # Response cache for the read endpoints: 'none', 'memory' (per-process LRU + TTL)
+    # or 'redis' (shared by all workers, needs the redis package). Writes invalidate
+    # the affected entries; a 'memory' cache only sees its own process's writes
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'none')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # /api/events change feed: 'none', 'local' (this process's writes only) or
+    # 'postgres' (LISTEN/NOTIFY on EVENTS_CHANNEL, shared by all workers). Defaults to
+    # 'postgres' on PostgreSQL, since the production server runs several workers
+    EVENTS_BACKEND = os.environ.get(
+        'EVENTS_BACKEND', 'postgres' if SQLALCHEMY_DATABASE_URI.startswith('postgresql') else 'local'
+    )
+    EVENTS_CHANNEL = os.environ.get('EVENTS_CHANNEL', 'wedding_changes')
+    EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 100))  # messages per client
+    EVENTS_MAX_CLIENTS = int(os.environ.get('EVENTS_MAX_CLIENTS', 500))
+    EVENTS_HEARTBEAT = int(os.environ.get('EVENTS_HEARTBEAT', 15))  # seconds
+    
+    # Streams served by the Flask view hold a request thread each, so a WSGI worker
+    # accepts at most this many (default: SERVER_THREADS - 1, leaving a thread for
+    # other requests); asgi.py streams hold no thread and only EVENTS_MAX_CLIENTS applies
+    EVENTS_MAX_THREAD_CLIENTS = int(os.environ['EVENTS_MAX_THREAD_CLIENTS']) \
+        if os.environ.get('EVENTS_MAX_THREAD_CLIENTS') else None
+    
+    # Production server (flask serve / wsgi.py): preforked gunicorn workers, each
+    # running SERVER_THREADS request threads. Timeouts are in seconds
+    SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+    SERVER_PORT = int(os.environ.get('SERVER_PORT', 5000))
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 60))
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+    SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 0))  # restart workers after N (0 = never)
+    SERVER_ACCESS_LOG = os.environ.get('SERVER_ACCESS_LOG', 'True').lower() == 'true'
+    
+    # ASGI serving mode (asgi.py): async read routes on an async engine. The async URI
+    # defaults to SQLALCHEMY_DATABASE_URI with its async driver (asyncpg/aiosqlite);
+    # other routes run on the Flask app through a pool of ASGI_WSGI_THREADS threads
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URI')
+    ASYNC_ENGINE_OPTIONS = {}  # merged over the DB_POOL_* settings, like SQLALCHEMY_ENGINE_OPTIONS
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 10))
     
     # CORS Configuration (allow all origins for development)
     CORS_HEADERS = 'Content-Type'
@@ -40,9 +146,12 @@ class Config:
     # Frontend URL for CORS
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
     
-    # File Upload Configuration (if needed later)
+    # File Upload Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Families inserted per transaction by /api/import
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+    
     # Session Configuration
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     
@@ -56,6 +165,7 @@ class DevelopmentConfig(Config):
     DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     TESTING = False
     SQLALCHEMY_ECHO = True  # Show SQL queries in development
+    JSON_PRETTYPRINT = True
 
 
 class ProductionConfig(Config):
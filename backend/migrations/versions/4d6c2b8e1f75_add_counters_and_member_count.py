@@ -0,0 +1,44 @@
+"""Add counters table and families.member_count for O(1) stats
+
+Revision ID: 4d6c2b8e1f75
+Revises: f5b17c3a9e24
+Create Date: 2026-10-16 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d6c2b8e1f75'
+down_revision = 'f5b17c3a9e24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('families', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_families', sa.BigInteger(), nullable=False),
+    sa.Column('total_guests', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Backfill from the existing rows
+    op.execute(
+        'UPDATE families SET member_count = '
+        '(SELECT COUNT(*) FROM persons WHERE persons.family_id = families.id)'
+    )
+    op.execute(
+        'INSERT INTO counters (id, total_families, total_guests) VALUES '
+        '(1, (SELECT COUNT(*) FROM families), (SELECT COUNT(*) FROM persons))'
+    )
+
+
+def downgrade():
+    op.drop_table('counters')
+    with op.batch_alter_table('families', schema=None) as batch_op:
+        batch_op.drop_column('member_count')
@@ -0,0 +1,25 @@
+"""Add composite (created_at, id) index for keyset pagination
+
+Revision ID: 8b41e6d2c5a3
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b41e6d2c5a3'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('families', schema=None) as batch_op:
+        batch_op.create_index('ix_families_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('families', schema=None) as batch_op:
+        batch_op.drop_index('ix_families_created_at_id')
@@ -0,0 +1,58 @@
+"""Add sync_version columns, tombstones and sync floor for /api/changes
+
+Revision ID: 9a3e5c7b2d18
+Revises: 4d6c2b8e1f75
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3e5c7b2d18'
+down_revision = '4d6c2b8e1f75'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('families', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_version', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_families_sync_version'), ['sync_version'], unique=False)
+
+    with op.batch_alter_table('persons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_version', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_persons_sync_version'), ['sync_version'], unique=False)
+
+    with op.batch_alter_table('data_version', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_floor', sa.BigInteger(), server_default='0', nullable=False))
+
+    op.create_table('tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tombstones_version'), ['version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tombstones_version'))
+
+    op.drop_table('tombstones')
+
+    with op.batch_alter_table('data_version', schema=None) as batch_op:
+        batch_op.drop_column('sync_floor')
+
+    with op.batch_alter_table('persons', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_persons_sync_version'))
+        batch_op.drop_column('sync_version')
+
+    with op.batch_alter_table('families', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_families_sync_version'))
+        batch_op.drop_column('sync_version')
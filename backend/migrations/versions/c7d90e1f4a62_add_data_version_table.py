@@ -0,0 +1,30 @@
+"""Add data_version table bumped by every family/person write
+
+Revision ID: c7d90e1f4a62
+Revises: 8b41e6d2c5a3
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d90e1f4a62'
+down_revision = '8b41e6d2c5a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_version = op.create_table('data_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(data_version, [{'id': 1, 'version': 0, 'updated_at': None}])
+
+
+def downgrade():
+    op.drop_table('data_version')
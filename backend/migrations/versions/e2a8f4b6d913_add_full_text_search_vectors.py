@@ -0,0 +1,52 @@
+"""Add generated tsvector columns and GIN indexes for full-text search
+
+Revision ID: e2a8f4b6d913
+Revises: c7d90e1f4a62
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a8f4b6d913'
+down_revision = 'c7d90e1f4a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Generated columns and GIN indexes are PostgreSQL (12+) only
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.add_column('families', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "to_tsvector('simple', coalesce(family_name, '') || ' ' || coalesce(address, ''))",
+            persisted=True
+        )
+    ))
+    op.create_index('ix_families_search_vector', 'families', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+
+    op.add_column('persons', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple', coalesce(name, ''))", persisted=True)
+    ))
+    op.create_index('ix_persons_search_vector', 'persons', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_persons_search_vector', table_name='persons')
+    op.drop_column('persons', 'search_vector')
+    op.drop_index('ix_families_search_vector', table_name='families')
+    op.drop_column('families', 'search_vector')
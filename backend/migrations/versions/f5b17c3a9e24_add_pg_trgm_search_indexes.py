@@ -0,0 +1,38 @@
+"""Add pg_trgm GIN indexes for fuzzy and substring search
+
+Revision ID: f5b17c3a9e24
+Revises: e2a8f4b6d913
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5b17c3a9e24'
+down_revision = 'e2a8f4b6d913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pg_trgm is a PostgreSQL extension; nothing to do elsewhere
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_families_family_name_trgm', 'families', ['family_name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'family_name': 'gin_trgm_ops'})
+    op.create_index('ix_families_address_trgm', 'families', ['address'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'address': 'gin_trgm_ops'})
+    op.create_index('ix_persons_name_trgm', 'persons', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_persons_name_trgm', table_name='persons')
+    op.drop_index('ix_families_address_trgm', table_name='families')
+    op.drop_index('ix_families_family_name_trgm', table_name='families')
@@ -1,6 +1,10 @@
 import os
+import click
+from datetime import datetime, timedelta
 from app import create_app, db
-from app.models import Family, Person
+from app.models import Family, Person, bump_data_version, rebuild_counters, reset_sync
+from app.response_cache import invalidate
+from app.db_pool import pool_status
 
 # Create the Flask application instance
 app = create_app()
@@ -113,11 +117,19 @@ def test_db():
             print(f"  - Families: {family_count}")
             print(f"  - Guests: {person_count}")
             
+            status = pool_status(db.engine)
+            print(f"  - Pool: {status.pop('pool')}"
+                  f" (pre-ping: {app.config['DB_POOL_PRE_PING']}, recycle: {app.config['DB_POOL_RECYCLE']}s,"
+                  f" statement timeout: {app.config['DB_STATEMENT_TIMEOUT']}ms,"
+                  f" pgbouncer: {app.config['DB_PGBOUNCER']})")
+            for name, value in status.items():
+                print(f"      {name}: {value}")
+            
             if family_count > 0:
                 print("\n  Recent families:")
                 families = Family.query.order_by(Family.created_at.desc()).limit(3).all()
                 for family in families:
-                    print(f"    • {family.family_name} ({len(family.members)} members)")
+                    print(f"    • {family.family_name} ({family.member_count} members)")
             
     except Exception as e:
         print(f"✗ Database connection failed: {str(e)}")
@@ -130,6 +142,71 @@ def test_db():
         print("  5. Create tables: flask db upgrade")
 
 
+@app.cli.command('rebuild-counters')
+def rebuild_counters_command():
+    """
+    Recompute /api/stats counters and per-family member counts from the tables
+    Usage: flask rebuild-counters
+    """
+    try:
+        with app.app_context():
+            total_families, total_guests = rebuild_counters(db.session.connection())
+            db.session.commit()
+            invalidate(['stats'])
+            
+            print("✓ Counters rebuilt successfully!")
+            print(f"  - Families: {total_families}")
+            print(f"  - Guests: {total_guests}")
+            
+    except Exception as e:
+        db.session.rollback()
+        print(f"✗ Error rebuilding counters: {str(e)}")
+
+
+@app.cli.command('prune-tombstones')
+@click.option('--days', default=30, show_default=True, help='Keep tombstones younger than this')
+def prune_tombstones_command(days):
+    """
+    Delete old /api/changes tombstones; clients with older sync tokens must resync
+    Usage: flask prune-tombstones --days 30
+    """
+    try:
+        with app.app_context():
+            removed = reset_sync(db.session.connection(), before=datetime.utcnow() - timedelta(days=days))
+            db.session.commit()
+            print(f"✓ Removed {removed} tombstones older than {days} days")
+            
+    except Exception as e:
+        db.session.rollback()
+        print(f"✗ Error pruning tombstones: {str(e)}")
+
+
+@app.cli.command('serve', with_appcontext=False)
+@click.option('--host', default=lambda: app.config['SERVER_HOST'], show_default='SERVER_HOST')
+@click.option('--port', type=int, default=lambda: app.config['SERVER_PORT'], show_default='SERVER_PORT')
+@click.option('--workers', type=int, help='Worker processes (default: SERVER_WORKERS)')
+@click.option('--threads', type=int, help='Threads per worker (default: SERVER_THREADS)')
+def serve_command(host, port, workers, threads):
+    """
+    Run the production server: preforked gunicorn workers with request threads
+    Usage: flask serve --workers 4 --threads 4
+    """
+    from app.server import ProductionServer, server_options, per_process_warnings
+    from app.db_pool import dispose_engines
+    
+    options = server_options(app, host, port, workers, threads)
+    # The /api/events thread limit follows the thread count actually served
+    app.config['SERVER_THREADS'] = options['threads']
+    print(f"✓ Serving on http://{host}:{port} "
+          f"with {options['workers']} workers x {options['threads']} threads")
+    for warning in per_process_warnings(app, options['workers'], options['threads']):
+        print(f"⚠ {warning}")
+    
+    # Workers are forked from this process; leave them no inherited connections
+    dispose_engines(app, close=True)
+    ProductionServer(app, options).run()
+
+
 @app.cli.command()
 def clear_data():
     """
@@ -151,7 +228,13 @@ def clear_data():
             if confirmation == 'DELETE':
                 Person.query.delete()
                 Family.query.delete()
+                # Bulk deletes skip flush events, so bump the data version,
+                # reset the counters and sync state and drop cached responses by hand
+                bump_data_version(db.session.connection())
+                rebuild_counters(db.session.connection())
+                reset_sync(db.session.connection())
                 db.session.commit()
+                invalidate()
                 print("✓ All data cleared successfully!")
             else:
                 print("✗ Operation cancelled.")
@@ -224,7 +307,8 @@ if __name__ == '__main__':
     # Get host and port from environment variables or use defaults
     host = os.environ.get('FLASK_HOST', '127.0.0.1')
     port = int(os.environ.get('FLASK_PORT', 5000))
-    debug = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
+    # The Werkzeug debugger is opt-in (FLASK_DEBUG=True); use 'flask serve' in production
+    debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
     print("=" * 70)
     print("       Wedding Guest Management API - Backend Server")
@@ -245,6 +329,9 @@ if __name__ == '__main__':
     print("  flask test_db              - Test database connection & show stats")
     print("  flask seed_db              - Add sample data for testing")
     print("  flask clear_data           - Delete all data (keep tables)")
+    print("  flask rebuild-counters     - Recompute stats counters if they drift")
+    print("  flask prune-tombstones     - Drop delete records older than --days (30)")
+    print("  flask serve                - Production server (gunicorn workers x threads)")
     print("\n💡 FIRST TIME SETUP:")
     print("  1. Make sure PostgreSQL is running")
     print("  2. Create database: psql -U postgres -c 'CREATE DATABASE wedding_guests;'")
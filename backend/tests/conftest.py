@@ -0,0 +1,32 @@
+import os
+import sys
+import pytest
+
+# Config reads the environment at import time: point it at SQLite and keep
+# process-wide extras (export cache on disk, change feed) out of the way
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+os.environ['EXPORT_CACHE_ENABLED'] = 'False'
+os.environ['EVENTS_BACKEND'] = 'none'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """Application on a fresh in-memory SQLite database"""
+    app = create_app()
+    app.config.update(TESTING=True, SQLALCHEMY_ECHO=False)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import Family, Person
+from app.serializers import FAMILY_KEYS
+
+
+# Families in the small dataset; the large one has ten times as many
+SMALL = 20
+
+
+def seed_families(app, count, members=3):
+    with app.app_context():
+        db.session.add_all(
+            Family(family_name=f'Family {number}', address=f'{number} Main Road',
+                   members=[Person(name=f'Guest {number}-{member}') for member in range(members)])
+            for number in range(count)
+        )
+        db.session.commit()
+
+
+def record_statements(app, request):
+    """Run request() (reading streamed bodies to the end); returns (response, statements)"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = request()
+        response.get_data()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return response, statements
+
+
+def count_queries(app, client, url):
+    """Run a GET and return the number of statements it executed"""
+    response, statements = record_statements(app, lambda: client.get(url))
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize('url', [
+    '/api/families?all=1',
+    '/api/families?include=members&limit=500',
+    '/api/families?stream=1',
+    '/api/search?q=family&all=1',
+    '/api/export/csv?layout=table',
+])
+def test_query_count_does_not_grow_with_families(app, client, url):
+    seed_families(app, SMALL)
+    small = count_queries(app, client, url)
+
+    seed_families(app, SMALL * 9)
+    large = count_queries(app, client, url)
+
+    assert large == small
+
+
+def test_members_are_loaded_for_every_family(app, client):
+    seed_families(app, SMALL, members=2)
+
+    families = client.get('/api/families?all=1').get_json()
+
+    assert len(families) == SMALL
+    assert all(len(family['members']) == family['member_count'] == 2 for family in families)
+
+
+FIELD_COMBINATIONS = [
+    ','.join(key for bit, key in enumerate(FAMILY_KEYS) if mask & (1 << bit))
+    for mask in range(1, 1 << len(FAMILY_KEYS))
+]
+
+
+@pytest.mark.parametrize('include', [None, 'members'])
+def test_fields_and_include_project_the_full_family(app, client, include):
+    seed_families(app, 3, members=2)
+    full = {family['id']: family for family in client.get('/api/families?all=1').get_json()}
+
+    for fields in FIELD_COMBINATIONS:
+        query = f'fields={fields}' + (f'&include={include}' if include else '')
+        keys = fields.split(',')
+        if include and 'members' not in keys:
+            keys.append('members')
+        expected_keys = [key for key in FAMILY_KEYS if key in keys]
+
+        expected = [{key: family[key] for key in expected_keys} for family in full.values()]
+
+        listed = client.get(f'/api/families?all=1&{query}').get_json()
+        assert listed == expected, query
+        assert [list(family) for family in listed] == [expected_keys] * len(full), query
+
+        for family_id, family in zip(full, expected):
+            assert client.get(f'/api/families/{family_id}?{query}').get_json() == family, query
+
+
+
+@pytest.mark.parametrize('method, url, body', [
+    ('post', '/api/persons', {'family_id': 1, 'name': 'New Guest'}),
+    ('put', '/api/persons/1', {'name': 'Renamed Guest'}),
+    ('delete', '/api/persons/2', None),
+])
+def test_person_writes_do_not_load_family_members(app, client, method, url, body):
+    seed_families(app, 1, members=3)
+
+    response, statements = record_statements(app, lambda: getattr(client, method)(url, json=body))
+
+    assert response.status_code in (200, 201)
+    assert not [statement for statement in statements
+                if 'FROM persons' in statement and 'persons.family_id IN' in statement]
@@ -0,0 +1,26 @@
+import io
+import pytest
+
+
+def upload(client, content, filename='guests.csv'):
+    return client.post('/api/import', data={'file': (io.BytesIO(content), filename)},
+                       content_type='multipart/form-data')
+
+
+def test_import_structured_csv(client):
+    response = upload(client, b'Family,Address,Members,Count\nSharma,12 MG Road,"Anil, Sunita",2\n')
+
+    assert response.status_code == 201
+    assert response.get_json()['families'] == 1
+    assert response.get_json()['guests'] == 2
+
+
+@pytest.mark.parametrize('content', [
+    b'Family,Address,Members,Count\nSharma,12 MG Road,"' + b'x' * (1024 * 1024) + b'"\n',
+    b'Family,Address,Members,Count\n\xff\xfe,12 MG Road,Anil\n',
+], ids=['field-too-large', 'not-utf8'])
+def test_malformed_csv_is_rejected(client, content):
+    response = upload(client, content)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Could not read upload')
@@ -0,0 +1,134 @@
+import sqlite3
+from contextlib import closing
+import pytest
+from flask import g
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Family, Person
+
+
+REPLICA = 'replica_1'
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """Application on a SQLite primary with one SQLite file as its read replica"""
+    paths = {None: tmp_path / 'primary.db', REPLICA: tmp_path / 'replica.db'}
+    monkeypatch.setattr('config.Config.SQLALCHEMY_DATABASE_URI', f'sqlite:///{paths[None]}')
+    monkeypatch.setattr('config.Config.SQLALCHEMY_BINDS', {REPLICA: f'sqlite:///{paths[REPLICA]}'})
+    monkeypatch.setattr('config.Config.DB_REPLICA_LAG_CHECK_INTERVAL', 0)
+    monkeypatch.setattr('config.Config.RESPONSE_CACHE_BACKEND', 'memory')
+
+    app = create_app()
+    app.config.update(TESTING=True, SQLALCHEMY_ECHO=False)
+    app.replica_paths = paths
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def replicate(app):
+    """Bring the replica up to date: copy the primary database over it"""
+    with closing(sqlite3.connect(app.replica_paths[None])) as primary, \
+            closing(sqlite3.connect(app.replica_paths[REPLICA])) as replica:
+        primary.backup(replica)
+
+
+def add_family(app, name):
+    with app.app_context():
+        db.session.add(Family(family_name=name, address='1 Main Road', members=[Person(name=f'{name} Guest')]))
+        db.session.commit()
+
+
+def family_reads(app, request):
+    """Run request(); returns (response, {bind key: statements reading the families table})"""
+    reads = {None: 0, REPLICA: 0}
+
+    def recorder(key):
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if 'FROM families' in statement:
+                reads[key] += 1
+        return record
+
+    with app.app_context():
+        listeners = [(db.engines[key], recorder(key)) for key in reads]
+    for engine, listener in listeners:
+        event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        response = request()
+    finally:
+        for engine, listener in listeners:
+            event.remove(engine, 'before_cursor_execute', listener)
+    return response, reads
+
+
+def test_get_reads_go_to_the_replica(replica_app):
+    add_family(replica_app, 'Smith')
+    replicate(replica_app)
+    client = replica_app.test_client()
+
+    response, reads = family_reads(replica_app, lambda: client.get('/api/families?all=1'))
+    assert response.status_code == 200
+    assert [family['family_name'] for family in response.get_json()] == ['Smith']
+    assert reads[REPLICA] > 0 and reads[None] == 0
+
+
+def test_reads_after_a_flush_stay_on_the_primary(replica_app):
+    replicate(replica_app)
+    add_family(replica_app, 'Smith')
+
+    with replica_app.test_request_context('/api/families'):
+        g.db_replica = REPLICA
+        assert db.session.scalar(db.select(db.func.count(Family.id))) == 0
+
+        db.session.add(Family(family_name='Jones', address='2 Main Road'))
+        db.session.flush()
+        assert db.session.scalar(db.select(db.func.count(Family.id))) == 2
+        db.session.rollback()
+
+
+def test_unreachable_replica_is_skipped(replica_app):
+    # The replica has no schema (and so no data version) yet
+    add_family(replica_app, 'Smith')
+    client = replica_app.test_client()
+
+    response, reads = family_reads(replica_app, lambda: client.get('/api/families?all=1'))
+    assert response.status_code == 200
+    assert [family['family_name'] for family in response.get_json()] == ['Smith']
+    assert reads[None] > 0 and reads[REPLICA] == 0
+
+
+def test_replica_beyond_max_lag_is_skipped(replica_app):
+    add_family(replica_app, 'Smith')
+    replicate(replica_app)
+    add_family(replica_app, 'Jones')
+    replica_app.extensions['replica_router'].max_lag = 0
+    client = replica_app.test_client()
+
+    response, reads = family_reads(replica_app, lambda: client.get('/api/families?all=1'))
+    assert sorted(family['family_name'] for family in response.get_json()) == ['Jones', 'Smith']
+    assert reads[None] > 0 and reads[REPLICA] == 0
+
+
+def test_lagging_replica_response_is_not_cached(replica_app):
+    add_family(replica_app, 'Smith')
+    replicate(replica_app)
+    add_family(replica_app, 'Jones')
+    client = replica_app.test_client()
+    cache = replica_app.extensions['response_cache']
+
+    # Within DB_REPLICA_MAX_LAG, so still read from, but behind the primary's data version
+    for _ in range(2):
+        response, reads = family_reads(replica_app, lambda: client.get('/api/families?all=1'))
+        assert [family['family_name'] for family in response.get_json()] == ['Smith']
+        assert response.headers['X-Cache'] == 'MISS'
+        assert reads[REPLICA] > 0
+    assert cache.stats()['entries'] == 0
+
+    replicate(replica_app)
+    assert client.get('/api/families?all=1').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/families?all=1').headers['X-Cache'] == 'HIT'
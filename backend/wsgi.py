@@ -0,0 +1,9 @@
+from app import create_app
+
+# WSGI application instance for production servers
+# Usage: flask serve (preforked gunicorn workers configured from Config)
+#    or: gunicorn --workers 4 --threads 4 --worker-class gthread wsgi:app
+# (without --preload every worker builds its own app and connection pool; with it,
+# create_app's fork hook starts every worker with an empty pool)
+# Keep SERVER_THREADS equal to --threads: /api/events accepts SERVER_THREADS - 1 streams per worker
+app = create_app()
@@ -5,6 +5,7 @@ import SearchBar from '../components/SearchBar';
 import FamilyList from '../components/FamilyList';
 import FamilyForm from '../components/FamilyForm';
 import PersonForm from '../components/PersonForm';
+import { FAMILIES_PAGE_SIZE } from '../utils/constants';
 
 const Dashboard = () => {
   // State
@@ -33,12 +34,20 @@ const Dashboard = () => {
     filterFamilies();
   }, [searchQuery, families]);
 
-  // Fetch all families from API
+  // Fetch all families from API, following the pagination cursor page by page
   const fetchFamilies = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/families');
-      setFamilies(response.data);
+      let allFamilies = [];
+      let cursor = null;
+      do {
+        const response = await api.get('/families', {
+          params: { limit: FAMILIES_PAGE_SIZE, cursor },
+        });
+        allFamilies = allFamilies.concat(response.data.families);
+        cursor = response.data.next_cursor;
+      } while (cursor);
+      setFamilies(allFamilies);
       setError(null);
     } catch (err) {
       console.error('Error fetching families:', err);
@@ -66,7 +66,10 @@ api.interceptors.response.use(
 
 // API helper functions (optional - for better code organization)
 export const familyAPI = {
-  getAll: () => api.get('/families'),
+  // Paginated: pass { limit, cursor } and follow response.data.next_cursor
+  getPage: (params) => api.get('/families', { params }),
+  // Full unpaginated list
+  getAll: () => api.get('/families', { params: { all: 1 } }),
   getById: (id) => api.get(`/families/${id}`),
   create: (data) => api.post('/families', data),
   update: (id, data) => api.put(`/families/${id}`, data),
@@ -77,10 +80,13 @@ export const personAPI = {
   create: (data) => api.post('/persons', data),
   update: (id, data) => api.put(`/persons/${id}`, data),
   delete: (id) => api.delete(`/persons/${id}`),
+  // ops: [{ op: 'create', family_id, name }, { op: 'update', id, name }, { op: 'delete', id }]
+  batch: (ops) => api.post('/persons/batch', ops),
 };
 
 export const statsAPI = {
   get: () => api.get('/stats'),
+  summary: () => api.get('/stats/summary'),
 };
 
 export const exportAPI = {
@@ -88,8 +94,40 @@ export const exportAPI = {
   csv: () => api.get('/export/csv', { responseType: 'blob' }),
 };
 
+export const importAPI = {
+  // file: a File from an <input type="file">; dryRun validates without saving
+  upload: (file, dryRun = false) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    return api.post('/import', formData, {
+      params: dryRun ? { dry_run: 1 } : {},
+      headers: { 'Content-Type': 'multipart/form-data' },
+      timeout: 120000,
+    });
+  },
+};
+
 export const searchAPI = {
-  search: (query) => api.get('/search', { params: { q: query } }),
+  search: (query, params) => api.get('/search', { params: { q: query, ...params } }),
+};
+
+export const syncAPI = {
+  // Omit since for a full snapshot; keep response.data.token for the next call.
+  // A 410 means the token expired - call again without since
+  changes: (since) => api.get('/changes', { params: since ? { since } : {} }),
+};
+
+export const eventsAPI = {
+  // Live change feed (Server-Sent Events). onChange receives each committed batch
+  // of [{ type, id, op, updated_at }]; onResync fires when this client fell behind
+  // and should catch up with syncAPI.changes. Returns a function that closes the stream
+  subscribe: ({ onReady, onChange, onResync }) => {
+    const source = new EventSource(`${API_BASE_URL}/events`);
+    if (onReady) source.addEventListener('ready', (e) => onReady(JSON.parse(e.data)));
+    if (onChange) source.addEventListener('change', (e) => onChange(JSON.parse(e.data)));
+    if (onResync) source.addEventListener('resync', () => onResync());
+    return () => source.close();
+  },
 };
 
 export default api;
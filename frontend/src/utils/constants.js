@@ -8,6 +8,9 @@ export const API_ENDPOINTS = {
   SEARCH: '/search',
 };
 
+// Page size used when walking the paginated /families and /search endpoints
+export const FAMILIES_PAGE_SIZE = 200;
+
 // App Configuration
 export const APP_CONFIG = {
   NAME: 'Wedding Guest Management',